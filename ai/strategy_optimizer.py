@@ -67,7 +67,7 @@ class StrategyOptimizer:
                 self.strategy_params['influencer_criteria']['min_score'] = 60
                 AI_WEIGHT_SHIFTS_TOTAL.labels(strategy='influencer', source='conversion').inc()
         # 4. Analyze referral triggers (mock: suppress if too frequent)
-        if hasattr(self.referral_trigger, 'event_log') and len(self.referral_trigger.event_log) > 20:
+        if getattr(self.referral_trigger, 'event_count', 0) > 20:
             self.strategy_params['trigger_suppression']['referral'] = True
             AI_WEIGHT_SHIFTS_TOTAL.labels(strategy='trigger', source='referral').inc()
         # 5. Output to config update pipeline (here: update settings in-memory)
@@ -80,7 +80,7 @@ class StrategyOptimizer:
     def _update_config(self):
         # In production, push to DB, config file, or distributed cache
         # Here, we update the settings object in-memory (mock)
-        self.settings.strategy_params = self.strategy_params
+        self.settings.update_strategy_params(self.strategy_params)
 
     def get_strategy_params(self) -> Dict[str, Any]:
         return self.strategy_params 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from typing import Optional
+from contextlib import asynccontextmanager
 from datetime import datetime
 import csv
 import io
@@ -10,20 +11,46 @@ import psutil
 from monitoring.agent_status_tracker import AgentStatusTracker
 from monitoring.metrics_collector import MetricsCollector
 from monitoring.log_viewer import LogViewer
-from neonhub.services.engagement_tracker import EngagementTracker
+from neonhub.services.engagement_tracker import get_engagement_tracker
+from neonhub.services.trigger_manager import get_trigger_manager
 from neonhub.schemas.lead_state import LeadState
 from analytics.growth_insights import GrowthInsights
 
-app = FastAPI(title="NeonHub Dashboard API")
-
 agent_status_tracker = AgentStatusTracker()
 metrics_collector = MetricsCollector()
 log_viewer = LogViewer()
-engagement_tracker = EngagementTracker()
+engagement_tracker = get_engagement_tracker()
 growth_insights = GrowthInsights()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write out engagement state still waiting in the coalescing window
+    await engagement_tracker.flush()
+    # Flushed state may have fired triggers, so close their log last
+    get_trigger_manager().close()
+
+app = FastAPI(title="NeonHub Dashboard API", lifespan=lifespan)
+
 app_start_time = time.time()
 
+# Process stats are sampled at most every PROCESS_SAMPLE_TTL seconds
+PROCESS_SAMPLE_TTL = 0.5
+_process = psutil.Process()
+_process.cpu_percent(interval=None)  # prime the non-blocking CPU counter
+_process_sample = (float("-inf"), 0, 0.0)  # (monotonic time, rss MB, cpu %)
+
+def _sample_process():
+    global _process_sample
+    now = time.monotonic()
+    if now - _process_sample[0] > PROCESS_SAMPLE_TTL:
+        _process_sample = (
+            now,
+            _process.memory_info().rss // 1024 // 1024,
+            _process.cpu_percent(interval=None)
+        )
+    return _process_sample
+
 @app.get("/status/agents")
 def get_agent_status():
     return agent_status_tracker.get_all_statuses()
@@ -50,7 +77,7 @@ def get_lead_sequence(lead_id: str):
     state = engagement_tracker.get_lead_state(lead_id)
     if not state:
         raise HTTPException(status_code=404, detail="Lead not found")
-    return state.dict()
+    return Response(content=state.model_dump_json(), media_type="application/json")
 
 @app.get("/logs")
 def get_logs(
@@ -117,13 +144,11 @@ def uptime():
 
 @app.get("/metrics/full")
 def metrics_full():
-    process = psutil.Process()
-    mem = process.memory_info()
-    cpu = process.cpu_percent(interval=0.1)
+    _, memory_mb, cpu = _sample_process()
     return JSONResponse({
         "status": "ok",
         "uptime_seconds": int(time.time() - app_start_time),
-        "memory_mb": mem.rss // 1024 // 1024,
+        "memory_mb": memory_mb,
         "cpu_percent": cpu,
         # Add queue lengths, agent status, etc. as needed
     }) 
\ No newline at end of file
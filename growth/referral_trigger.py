@@ -1,4 +1,5 @@
 from typing import Dict, Any, Optional
+from collections import deque
 from datetime import datetime
 from prometheus_client import Counter
 import logging
@@ -26,11 +27,18 @@ REFERRAL_CONVERSION = Counter(
     ['reward_type']
 )
 
+EVENT_LOG_SIZE = 10_000  # most recent referral events kept in memory
+
 class ReferralTrigger:
     def __init__(self):
         self.logger = logging.getLogger("ReferralTrigger")
         self.messenger = PersonalMessenger()
-        self.event_log = []  # In production, use DB or persistent log
+        self.event_log = deque(maxlen=EVENT_LOG_SIZE)  # In production, use DB or persistent log
+        self.event_count = 0  # all events since start, including ones rotated out of event_log
+
+    def _log_event(self, event: ReferralEvent):
+        self.event_log.append(event)
+        self.event_count += 1
 
     def handle_ugc_engagement(self, post_data: Dict[str, Any]):
         # Decide reward type
@@ -52,7 +60,7 @@ class ReferralTrigger:
             status="sent",
             metadata={"post_url": post_data.get("url")}
         )
-        self.event_log.append(event)
+        self._log_event(event)
         UGC_REWARD_TRIGGERED.labels(platform=post_data.get("platform"), reward_type=reward_type).inc()
         REFERRAL_TRIGGERS_SENT.labels(type="ugc_reward", channel=channel).inc()
         self.logger.info(f"UGC reward triggered for {contact_id} on {channel} ({reward_type})")
@@ -74,7 +82,7 @@ class ReferralTrigger:
             status="sent",
             metadata={"profile": profile_data}
         )
-        self.event_log.append(event)
+        self._log_event(event)
         INFLUENCER_THANK_YOU_SENT.labels(platform=platform).inc()
         REFERRAL_TRIGGERS_SENT.labels(type="influencer_share", channel=channel).inc()
         self.logger.info(f"Influencer thank-you sent to {contact_id} on {platform}")
@@ -96,7 +104,7 @@ class ReferralTrigger:
             status="sent",
             metadata={"referred_lead": lead_id}
         )
-        self.event_log.append(event)
+        self._log_event(event)
         REFERRAL_CONVERSION.labels(reward_type=reward_type).inc()
         REFERRAL_TRIGGERS_SENT.labels(type="referral_conversion", channel=channel).inc()
         self.logger.info(f"Referral conversion tracked for {contact_id} (lead: {lead_id})")
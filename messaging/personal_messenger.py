@@ -1,5 +1,6 @@
 from typing import Optional, Dict
 from datetime import datetime, timedelta
+from functools import lru_cache
 import time
 import threading
 import uuid
@@ -182,4 +183,9 @@ class PersonalMessenger:
 
     def send_email(self, to_email: str, subject: str, body: str) -> bool:
         self.logger.info("Email sent", to_email=to_email, subject=subject)
-        return True 
\ No newline at end of file
+        return True
+
+@lru_cache()
+def get_personal_messenger() -> PersonalMessenger:
+    """Get shared messenger instance."""
+    return PersonalMessenger() 
\ No newline at end of file
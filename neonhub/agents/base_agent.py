@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, TypeVar, Generic
 from datetime import datetime
-import uuid
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -32,8 +31,8 @@ class BaseAgent(ABC, Generic[T]):
         self.agent_id = agent_id
         self.config = config or {}
         self.settings = get_settings()
-        self.trace_id = str(uuid.uuid4())
-        self.logger = get_logger(self.trace_id)
+        self.logger = get_logger()
+        self.trace_id = self.logger.trace_id
         self.last_run: Optional[datetime] = None
         self.status = "initialized"
         self.metrics = {}
@@ -9,7 +9,7 @@ from prometheus_client import Counter, Histogram
 from .base_agent import BaseAgent, AgentError
 from ..services.content_personalizer import ContentPersonalizer
 from ..services.sequence_manager import SequenceManager
-from ..services.engagement_tracker import EngagementTracker
+from ..services.engagement_tracker import get_engagement_tracker
 from ..config.settings import get_settings
 from ..utils.logging import get_logger
 
@@ -35,7 +35,7 @@ class EmailOutreachAgent(BaseAgent[Dict[str, Any]]):
         self.logger = get_logger()
         self.content_personalizer = ContentPersonalizer()
         self.sequence_manager = SequenceManager()
-        self.engagement_tracker = EngagementTracker()
+        self.engagement_tracker = get_engagement_tracker()
         self.smtp_connection = None
         self.campaign_queue: List[Dict[str, Any]] = []
         
@@ -137,6 +137,7 @@ class EmailOutreachAgent(BaseAgent[Dict[str, Any]]):
         
     async def cleanup(self) -> None:
         """Clean up resources."""
+        await self.engagement_tracker.flush()
         if self.smtp_connection:
             try:
                 self.smtp_connection.quit()
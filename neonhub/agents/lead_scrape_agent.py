@@ -83,7 +83,7 @@ class LeadScrapeAgent(BaseAgent[Dict[str, Any]]):
         
         try:
             # Parse location for better search
-            parsed_location = self.location_parser.parse(location)
+            parsed_location = await self.location_parser.parse(location)
             
             # Search LinkedIn
             with LEAD_SCRAPE_DURATION.labels(source="linkedin").time():
@@ -104,8 +104,9 @@ class LeadScrapeAgent(BaseAgent[Dict[str, Any]]):
             all_leads = self._combine_leads(linkedin_leads, google_leads)
             
             # Validate leads
-            for lead in all_leads:
-                if await self.validator.validate(lead):
+            valid = await self.validator.validate_many(all_leads, deep=True)
+            for lead, is_valid in zip(all_leads, valid):
+                if is_valid:
                     results["validated_leads"].append(lead)
                     results["total_found"] += 1
                     LEADS_FOUND.labels(
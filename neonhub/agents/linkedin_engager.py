@@ -1,12 +1,14 @@
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import asyncio
+import orjson
+from aiolimiter import AsyncLimiter
 from prometheus_client import Counter, Histogram
 import requests
 
 from ..schemas.linkedin_lead import LinkedInProfile, ConnectionStatus, MessageStatus
 from ..services.content_personalizer import ContentPersonalizer
-from ..services.engagement_tracker import EngagementTracker
+from ..services.engagement_tracker import get_engagement_tracker
 from ..utils.logging import get_logger
 from ..config.settings import get_settings
 
@@ -28,6 +30,9 @@ REPLIES_RECEIVED = Counter(
     'Number of LinkedIn message replies received'
 )
 
+PHANTOMBUSTER_LAUNCH_URL = "https://api.phantombuster.com/api/v2/agents/launch"
+PHANTOMBUSTER_CONCURRENCY = 64
+
 ENGAGEMENT_DURATION = Histogram(
     'neonhub_linkedin_engagement_duration_seconds',
     'Time spent on LinkedIn engagement actions',
@@ -41,24 +46,41 @@ class LinkedInEngager:
         self.settings = get_settings()
         self.logger = get_logger()
         self.content_personalizer = ContentPersonalizer()
-        self.engagement_tracker = EngagementTracker()
+        self.engagement_tracker = get_engagement_tracker()
         
         # Initialize API client
         self.phantom_buster_key = self.settings.phantombuster_api_key
+        self._phantom_sem = asyncio.BoundedSemaphore(PHANTOMBUSTER_CONCURRENCY)
         
         # Rate limiting
         self.max_connections_per_day = 100
+        self.max_connections_per_hour = 20
         self.max_messages_per_day = 50
+        self.max_messages_per_hour = 10
+        self._conn_daily = AsyncLimiter(self.max_connections_per_day, 86400)
+        self._conn_hourly = AsyncLimiter(self.max_connections_per_hour, 3600)
+        self._msg_daily = AsyncLimiter(self.max_messages_per_day, 86400)
+        self._msg_hourly = AsyncLimiter(self.max_messages_per_hour, 3600)
         self.connection_cooldown = timedelta(hours=24)
         self.message_cooldown = timedelta(hours=12)
         
+        # Pre-resolved metric children so the send paths skip labels() lookups
+        self._conn_success = CONNECTIONS_SENT.labels(status="success")
+        self._conn_error = CONNECTIONS_SENT.labels(status="error")
+        self._msg_success = MESSAGES_SENT.labels(status="success")
+        self._msg_error = MESSAGES_SENT.labels(status="error")
+        self._durations = {
+            action: ENGAGEMENT_DURATION.labels(action=action)
+            for action in ("connection", "message", "check_messages", "check_messages_bulk")
+        }
+        
     async def send_connection_request(
         self,
         profile: LinkedInProfile,
         message: Optional[str] = None
     ) -> bool:
         """Send a LinkedIn connection request."""
-        with ENGAGEMENT_DURATION.labels(action="connection").time():
+        with self._durations["connection"].time():
             try:
                 # Check rate limits
                 if not await self._check_connection_limits():
@@ -70,34 +92,31 @@ class LinkedInEngager:
                     
                 # Generate personalized message if not provided
                 if not message:
-                    message = await self.content_personalizer.generate_content(
+                    message = self.content_personalizer.generate_content(
                         "linkedin_connection_request",
                         {
                             "name": profile.name,
                             "title": profile.title,
                             "company": profile.company
                         }
-                    )
+                    )["body"]
                     
-                # Send connection request via PhantomBuster
-                response = requests.post(
-                    "https://api.phantombuster.com/api/v2/agents/launch",
-                    headers={"X-Phantombuster-Key": self.phantom_buster_key},
-                    json={
-                        "id": "linkedin-connection-requester",
-                        "argument": {
+                # Send connection request via PhantomBuster, consuming rate-limit capacity
+                async with self._conn_hourly, self._conn_daily:
+                    response = await self._launch(
+                        "linkedin-connection-requester",
+                        {
                             "profileUrl": profile.profile_url,
                             "message": message
                         }
-                    }
-                )
+                    )
                 
                 if response.status_code == 200:
                     # Update profile status
                     profile.update_connection_status(ConnectionStatus.PENDING)
                     
                     # Track metrics
-                    CONNECTIONS_SENT.labels(status="success").inc()
+                    self._conn_success.inc()
                     
                     self.logger.info(
                         "Connection request sent",
@@ -105,7 +124,7 @@ class LinkedInEngager:
                     )
                     return True
                     
-                CONNECTIONS_SENT.labels(status="error").inc()
+                self._conn_error.inc()
                 return False
                 
             except Exception as e:
@@ -114,7 +133,7 @@ class LinkedInEngager:
                     profile_id=profile.profile_id,
                     error=str(e)
                 )
-                CONNECTIONS_SENT.labels(status="error").inc()
+                self._conn_error.inc()
                 return False
                 
     async def send_message(
@@ -124,7 +143,7 @@ class LinkedInEngager:
         template_id: Optional[str] = None
     ) -> bool:
         """Send a LinkedIn message."""
-        with ENGAGEMENT_DURATION.labels(action="message").time():
+        with self._durations["message"].time():
             try:
                 # Check if connected
                 if profile.connection_status != ConnectionStatus.CONNECTED:
@@ -144,36 +163,33 @@ class LinkedInEngager:
                     
                 # Generate message content
                 if template_id:
-                    content = await self.content_personalizer.generate_content(
+                    content = self.content_personalizer.generate_content(
                         template_id,
                         {
                             "name": profile.name,
                             "title": profile.title,
                             "company": profile.company
                         }
-                    )
+                    )["body"]
                 elif not content:
-                    content = await self.content_personalizer.generate_content(
+                    content = self.content_personalizer.generate_content(
                         "linkedin_message",
                         {
                             "name": profile.name,
                             "title": profile.title,
                             "company": profile.company
                         }
-                    )
+                    )["body"]
                     
-                # Send message via PhantomBuster
-                response = requests.post(
-                    "https://api.phantombuster.com/api/v2/agents/launch",
-                    headers={"X-Phantombuster-Key": self.phantom_buster_key},
-                    json={
-                        "id": "linkedin-messenger",
-                        "argument": {
+                # Send message via PhantomBuster, consuming rate-limit capacity
+                async with self._msg_hourly, self._msg_daily:
+                    response = await self._launch(
+                        "linkedin-messenger",
+                        {
                             "profileUrl": profile.profile_url,
                             "message": content
                         }
-                    }
-                )
+                    )
                 
                 if response.status_code == 200:
                     # Add message to profile
@@ -181,7 +197,7 @@ class LinkedInEngager:
                     message.status = MessageStatus.SENT
                     
                     # Track metrics
-                    MESSAGES_SENT.labels(status="success").inc()
+                    self._msg_success.inc()
                     
                     self.logger.info(
                         "Message sent",
@@ -190,7 +206,7 @@ class LinkedInEngager:
                     )
                     return True
                     
-                MESSAGES_SENT.labels(status="error").inc()
+                self._msg_error.inc()
                 return False
                 
             except Exception as e:
@@ -199,53 +215,24 @@ class LinkedInEngager:
                     profile_id=profile.profile_id,
                     error=str(e)
                 )
-                MESSAGES_SENT.labels(status="error").inc()
+                self._msg_error.inc()
                 return False
                 
     async def check_messages(self, profile: LinkedInProfile) -> None:
         """Check for new message replies."""
-        with ENGAGEMENT_DURATION.labels(action="check_messages").time():
+        with self._durations["check_messages"].time():
             try:
                 # Get messages via PhantomBuster
-                response = requests.post(
-                    "https://api.phantombuster.com/api/v2/agents/launch",
-                    headers={"X-Phantombuster-Key": self.phantom_buster_key},
-                    json={
-                        "id": "linkedin-message-checker",
-                        "argument": {
-                            "profileUrl": profile.profile_url
-                        }
+                response = await self._launch(
+                    "linkedin-message-checker",
+                    {
+                        "profileUrl": profile.profile_url
                     }
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Update message statuses
-                    for msg in profile.messages:
-                        if msg.status == MessageStatus.SENT:
-                            msg.status = MessageStatus.DELIVERED
-                            
-                        # Check for replies
-                        if msg.status == MessageStatus.DELIVERED:
-                            reply = data.get("replies", {}).get(msg.message_id)
-                            if reply:
-                                msg.status = MessageStatus.REPLIED
-                                msg.reply_content = reply["content"]
-                                msg.reply_at = datetime.utcnow()
-                                
-                                # Track metrics
-                                REPLIES_RECEIVED.inc()
-                                
-                                # Track engagement
-                                await self.engagement_tracker.track_event(
-                                    profile.profile_id,
-                                    "linkedin_reply",
-                                    {
-                                        "message_id": msg.message_id,
-                                        "profile_id": profile.profile_id
-                                    }
-                                )
+                    data = orjson.loads(response.content)
+                    await self._apply_replies(profile, data.get("replies", {}))
                                 
             except Exception as e:
                 self.logger.error(
@@ -254,15 +241,88 @@ class LinkedInEngager:
                     error=str(e)
                 )
                 
+    async def check_messages_bulk(self, profiles: List[LinkedInProfile]) -> None:
+        """Check for new message replies across many profiles with a single request."""
+        message_ids = [
+            msg.message_id
+            for profile in profiles
+            for msg in profile.messages
+            if msg.status in (MessageStatus.SENT, MessageStatus.DELIVERED)
+        ]
+        if not message_ids:
+            return
+            
+        with self._durations["check_messages_bulk"].time():
+            try:
+                # Replies come back keyed by message id, so one call covers every profile
+                response = await self._launch(
+                    "linkedin-message-checker",
+                    {
+                        "profileUrls": [profile.profile_url for profile in profiles],
+                        "messageIds": message_ids
+                    }
+                )
+                
+                if response.status_code == 200:
+                    replies = orjson.loads(response.content).get("replies", {})
+                    for profile in profiles:
+                        await self._apply_replies(profile, replies)
+                        
+            except Exception as e:
+                self.logger.error(
+                    "Failed to check messages in bulk",
+                    profiles=len(profiles),
+                    error=str(e)
+                )
+                
+    async def _apply_replies(self, profile: LinkedInProfile, replies: Dict) -> None:
+        """Update a profile's message statuses from a replies-by-message-id payload."""
+        for msg in profile.messages:
+            if msg.status == MessageStatus.SENT:
+                msg.status = MessageStatus.DELIVERED
+                
+            # Check for replies
+            if msg.status == MessageStatus.DELIVERED:
+                reply = replies.get(msg.message_id)
+                if reply:
+                    msg.status = MessageStatus.REPLIED
+                    msg.reply_content = reply["content"]
+                    msg.reply_at = datetime.utcnow()
+                    
+                    # Track metrics
+                    REPLIES_RECEIVED.inc()
+                    
+                    # Track engagement
+                    await self.engagement_tracker.track_event(
+                        profile.profile_id,
+                        "linkedin_reply",
+                        {
+                            "message_id": msg.message_id,
+                            "profile_id": profile.profile_id
+                        }
+                    )
+                    
+    async def _launch(self, agent_id: str, argument: Dict) -> requests.Response:
+        """Launch a PhantomBuster agent off the event loop, bounded in concurrency."""
+        async with self._phantom_sem:
+            return await asyncio.to_thread(
+                requests.post,
+                PHANTOMBUSTER_LAUNCH_URL,
+                headers={"X-Phantombuster-Key": self.phantom_buster_key},
+                json={"id": agent_id, "argument": argument}
+            )
+            
     async def _check_connection_limits(self) -> bool:
         """Check if we're within connection request rate limits."""
-        # TODO: Implement rate limit checking
-        return True
+        return self._conn_daily.has_capacity() and self._conn_hourly.has_capacity()
         
     async def _check_message_limits(self) -> bool:
         """Check if we're within message rate limits."""
-        # TODO: Implement rate limit checking
-        return True
+        return self._msg_daily.has_capacity() and self._msg_hourly.has_capacity()
+        
+    async def close(self) -> None:
+        """Persist engagement tracked by this engager; call before shutting down."""
+        await self.engagement_tracker.flush()
         
     async def retry_failed_actions(self, profile: LinkedInProfile) -> None:
         """Retry failed connection requests and messages."""
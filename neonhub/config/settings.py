@@ -89,6 +89,8 @@ class Settings(BaseSettings):
     
     # Strategy (AI Optimization)
     strategy_params: Dict[str, Any] = Field(default_factory=dict)
+    strategy_params_version: int = Field(default=0)  # bumped on every update
+    conversion_stats_dir: Optional[str] = None  # shared counter slabs for multi-worker deployments
     
     phantombuster_api_key: str = Field(default="dummy")
     
@@ -124,6 +126,7 @@ class Settings(BaseSettings):
 
     def update_strategy_params(self, params: Dict[str, Any]):
         self.strategy_params = params
+        self.strategy_params_version += 1
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -1,5 +1,5 @@
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
 from enum import Enum
 from pydantic import BaseModel, Field
 
@@ -34,6 +34,9 @@ class LeadState(BaseModel):
     last_touch: datetime = Field(default_factory=datetime.utcnow)
     sequence_stages: List[SequenceStage]
     engagement_history: List[EngagementEvent] = Field(default_factory=list)
+    # Per-event-type aggregates over engagement_history, maintained on append
+    event_type_counts: Dict[str, int] = Field(default_factory=dict)
+    event_type_latest: Dict[str, datetime] = Field(default_factory=dict)
     metadata: Dict[str, str] = Field(default_factory=dict)
     utm_source: Optional[str] = None
     utm_medium: Optional[str] = None
@@ -48,6 +51,15 @@ class LeadState(BaseModel):
             datetime: lambda v: v.isoformat()
         }
         
+    def model_post_init(self, __context: Any) -> None:
+        # Counts are derived from the history; never trust persisted or passed-in values
+        self._recount_events()
+        
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "engagement_history":
+            self._recount_events()
+        
     def add_engagement_event(self, event_type: str, score_delta: int, metadata: Optional[Dict[str, str]] = None) -> None:
         """Add a new engagement event and update the score."""
         event = EngagementEvent(
@@ -56,19 +68,52 @@ class LeadState(BaseModel):
             metadata=metadata or {}
         )
         self.engagement_history.append(event)
+        self._count_event(event)
         self.engagement_score += score_delta
         self.last_touch = event.timestamp
         
+    def _count_event(self, event: EngagementEvent) -> None:
+        self.event_type_counts[event.event_type] = self.event_type_counts.get(event.event_type, 0) + 1
+        self.event_type_latest[event.event_type] = event.timestamp
+        
+    def _recount_events(self) -> None:
+        self.event_type_counts = {}
+        self.event_type_latest = {}
+        for event in self.engagement_history:
+            self._count_event(event)
+        
+    def event_counts(self) -> Dict[str, int]:
+        """Get per-event-type counts.
+        
+        Counts are rebuilt on construction and whenever engagement_history is
+        assigned; the length check also catches events appended to the list
+        directly instead of through add_engagement_event.
+        """
+        if sum(self.event_type_counts.values()) != len(self.engagement_history):
+            self._recount_events()
+        return self.event_type_counts
+        
+    def mark_cart_abandoned(self, abandoned_at: Optional[datetime] = None) -> None:
+        """Record a cart abandonment, keeping an epoch copy for cheap trigger checks."""
+        abandoned_at = abandoned_at or datetime.utcnow()
+        self.metadata["cart_abandoned_at"] = abandoned_at.isoformat()
+        # Naive values are UTC by convention; aware ones are converted, not relabelled
+        if abandoned_at.tzinfo is None:
+            abandoned_utc = abandoned_at.replace(tzinfo=timezone.utc)
+        else:
+            abandoned_utc = abandoned_at.astimezone(timezone.utc)
+        self.metadata["cart_abandoned_at_ts"] = str(int(abandoned_utc.timestamp()))
+        
     def get_next_stage(self) -> Optional[SequenceStage]:
         """Get the next pending stage in the sequence."""
         if self.current_stage >= len(self.sequence_stages):
             return None
         return self.sequence_stages[self.current_stage]
         
-    def complete_current_stage(self) -> None:
+    def complete_current_stage(self, completed_at: Optional[datetime] = None) -> None:
         """Mark the current stage as completed and move to the next."""
         if self.current_stage < len(self.sequence_stages):
-            self.sequence_stages[self.current_stage].completed_at = datetime.utcnow()
+            self.sequence_stages[self.current_stage].completed_at = completed_at or datetime.utcnow()
             self.sequence_stages[self.current_stage].status = "completed"
             self.current_stage += 1
             
@@ -1,7 +1,7 @@
 from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
 class ConnectionStatus(str, Enum):
     NOT_CONNECTED = "not_connected"
@@ -49,10 +49,11 @@ class LinkedInProfile(BaseModel):
     last_interaction: Optional[datetime] = None
     metadata: Dict[str, str] = Field(default_factory=dict)
     
-    class Config:
-        json_encoders = {
+    model_config = ConfigDict(
+        json_encoders={
             datetime: lambda v: v.isoformat()
         }
+    )
         
     def add_message(self, content: str, metadata: Optional[Dict[str, str]] = None) -> LinkedInMessage:
         """Add a new message to the profile's message history."""
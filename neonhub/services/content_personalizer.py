@@ -1,4 +1,5 @@
 from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
 import yaml
 import json
 from pathlib import Path
@@ -44,6 +45,20 @@ MOBILE_CONTENT_TRUNCATED = Counter(
     ['template_id', 'lang']
 )
 
+# Plain {{ var }} placeholders; anything richer is left to Jinja
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+def _render(text: str, context: Dict[str, Any]) -> str:
+    """Substitute placeholders in one regex pass, matching Jinja's output for plain variables."""
+    if "{%" in text or "{#" in text:
+        return Template(text).render(**context)
+    rendered = _PLACEHOLDER_RE.sub(lambda m: str(context.get(m.group(1), "")), text)
+    if "{{" in rendered:
+        # Filters, attribute access or expressions: needs the real engine
+        return Template(text).render(**context)
+    # Jinja drops a single trailing newline by default
+    return rendered[:-1] if rendered.endswith("\n") else rendered
+
 class ContentPersonalizer:
     """Service for generating personalized content using AI and rules-based logic."""
     
@@ -171,9 +186,8 @@ class ContentPersonalizer:
         if lang != "en" and variant.get("variant_id") not in ("universal", "fallback"):
             variant["variant_id"] = "fallback"
 
-        # Render with Jinja2
-        subject = Template(variant.get("subject", "")).render(**personalization)
-        body = Template(variant.get("body", "")).render(**personalization)
+        subject = _render(variant.get("subject", ""), personalization)
+        body = _render(variant.get("body", ""), personalization)
 
         # Add UTM tracking to all links
         utm_params = personalization.get("utm_params")
@@ -287,8 +301,7 @@ class ContentPersonalizer:
         result = {}
         for key, value in content.items():
             try:
-                template = Template(value)
-                result[key] = template.render(**lead_data)
+                result[key] = _render(value, lead_data)
             except Exception as e:
                 self.logger.error(
                     "Template variable replacement failed",
@@ -400,4 +413,9 @@ class ContentPersonalizer:
             template_id=template_id,
             variant_id=variant_id,
             lang=language
-        ).inc() 
\ No newline at end of file
+        ).inc() 
+
+@lru_cache()
+def get_content_personalizer() -> ContentPersonalizer:
+    """Get shared content personalizer instance."""
+    return ContentPersonalizer()
@@ -1,13 +1,17 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache, partial
+from weakref import WeakValueDictionary
+import asyncio
+from cachetools import LRUCache
 from prometheus_client import Counter, Histogram, Gauge
-import json
 from pathlib import Path
+import os
 
 from ..schemas.lead_state import LeadState, EngagementEvent
 from ..utils.logging import get_logger
 from ..config.settings import get_settings
-from neonhub.services.trigger_manager import TriggerManager
+from neonhub.services.trigger_manager import get_trigger_manager
 
 # Prometheus metrics
 ENGAGEMENT_EVENTS = Counter(
@@ -22,6 +26,12 @@ LEAD_SCORES = Gauge(
     ['lead_id', 'campaign_id']
 )
 
+# Upper bound on leads whose score is kept in memory
+SCORE_CACHE_SIZE = 10_000
+
+# Events for one lead landing within this window are persisted with a single write
+WRITE_COALESCE_SECONDS = 0.01
+
 ENGAGEMENT_DURATION = Histogram(
     'neonhub_engagement_duration_seconds',
     'Time between engagement events',
@@ -46,22 +56,74 @@ class EngagementTracker:
         self.logger = get_logger()
         self.states_dir = Path("data/lead_states")
         self.states_dir.mkdir(parents=True, exist_ok=True)
-        self.trigger_manager = TriggerManager()
+        self.trigger_manager = get_trigger_manager()
+        # lead_id -> ((inode, mtime_ns, size) of the state file, score); a stat() revalidates it,
+        # so writes from other trackers or processes are picked up without a full parse
+        self._scores: LRUCache = LRUCache(maxsize=SCORE_CACHE_SIZE)
+        # Per-lead locks serialize read-modify-write of one lead without blocking others
+        self._locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+        # Tracked-but-unwritten states and their scheduled flushes (write coalescing)
+        self._dirty: Dict[str, LeadState] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        
+    def _lead_lock(self, lead_id: str) -> asyncio.Lock:
+        lock = self._locks.get(lead_id)
+        if lock is None:
+            lock = self._locks[lead_id] = asyncio.Lock()
+        return lock
+        
+    @staticmethod
+    def _file_version(path: Path) -> Tuple[int, int, int]:
+        # Saves replace the file, so the inode changes even within one mtime tick
+        st = path.stat()
+        return st.st_ino, st.st_mtime_ns, st.st_size
+        
+    def _cached_score(self, lead_id: str) -> Optional[int]:
+        state = self._dirty.get(lead_id)
+        if state is not None:
+            return state.engagement_score
+        try:
+            version = self._file_version(self._get_state_path(lead_id))
+        except FileNotFoundError:
+            self._scores.pop(lead_id, None)
+            return None
+        cached = self._scores.get(lead_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        state = self.get_lead_state(lead_id)
+        if not state:
+            return None
+        self._scores[lead_id] = (version, state.engagement_score)
+        return state.engagement_score
         
     def _get_state_path(self, lead_id: str) -> Path:
         """Get the path for a lead's state file."""
         return self.states_dir / f"{lead_id}.json"
         
     def get_lead_state(self, lead_id: str) -> Optional[LeadState]:
-        """Load a lead's state from disk."""
+        """Load a lead's state, preferring changes not yet flushed to disk.
+        
+        Pending states are returned as copies; pass changes back through
+        save_lead_state.
+        """
+        state = self._dirty.get(lead_id)
+        if state is not None:
+            return state.model_copy(deep=True)
+        return self._load_state(lead_id)
+        
+    def _load_state(self, lead_id: str) -> Optional[LeadState]:
+        # Pending state itself (not a copy), for callers holding the lead lock
+        state = self._dirty.get(lead_id)
+        if state is not None:
+            return state
+            
         state_path = self._get_state_path(lead_id)
         if not state_path.exists():
             return None
             
         try:
-            with open(state_path, "r") as f:
-                data = json.load(f)
-                return LeadState(**data)
+            with open(state_path, "rb") as f:
+                return LeadState.model_validate_json(f.read())
         except Exception as e:
             self.logger.error(
                 "Failed to load lead state",
@@ -74,8 +136,13 @@ class EngagementTracker:
         """Save a lead's state to disk."""
         try:
             state_path = self._get_state_path(state.lead_id)
-            with open(state_path, "w") as f:
-                json.dump(state.dict(), f, indent=2)
+            tmp_path = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(state.model_dump_json())
+            # Atomic swap: readers in other processes never see a half-written file
+            os.replace(tmp_path, state_path)
+            self._scores[state.lead_id] = (self._file_version(state_path), state.engagement_score)
+            self._dirty.pop(state.lead_id, None)
         except Exception as e:
             self.logger.error(
                 "Failed to save lead state",
@@ -90,7 +157,16 @@ class EngagementTracker:
         metadata: Optional[Dict[str, str]] = None
     ) -> None:
         """Track an engagement event and update the lead's score."""
-        state = self.get_lead_state(lead_id)
+        async with self._lead_lock(lead_id):
+            await self._track_event(lead_id, event_type, metadata)
+            
+    async def _track_event(
+        self,
+        lead_id: str,
+        event_type: str,
+        metadata: Optional[Dict[str, str]]
+    ) -> None:
+        state = self._load_state(lead_id)
         if not state:
             self.logger.warning(
                 "Lead state not found for event",
@@ -112,8 +188,13 @@ class EngagementTracker:
             campaign_id=state.campaign_id
         ).set(state.engagement_score)
         
-        # Save updated state
-        self.save_lead_state(state)
+        # Save updated state; bursts for the same lead coalesce into one write
+        self._dirty[lead_id] = state
+        task = self._flush_tasks.get(lead_id)
+        # A task left on a closed loop (the tracker is process-wide) will never run
+        if task is None or task.done() or task.get_loop().is_closed():
+            task = self._flush_tasks[lead_id] = asyncio.create_task(self._flush_soon(lead_id))
+            task.add_done_callback(partial(self._forget_flush, lead_id))
         
         # Log event
         self.logger.info(
@@ -126,8 +207,7 @@ class EngagementTracker:
         
         # --- Trigger System Integration ---
         try:
-            updated_state = self.get_lead_state(lead_id)
-            trigger_result = self.trigger_manager.evaluate_and_trigger(updated_state)
+            trigger_result = self.trigger_manager.evaluate_and_trigger(state)
             self.logger.info(
                 "Trigger evaluation after engagement event",
                 lead_id=lead_id,
@@ -143,34 +223,60 @@ class EngagementTracker:
                 error=str(e)
             )
         
+    def _forget_flush(self, lead_id: str, task: asyncio.Task) -> None:
+        # Also runs for cancelled tasks; leave a newer task for the lead in place
+        if self._flush_tasks.get(lead_id) is task:
+            del self._flush_tasks[lead_id]
+            
+    async def _flush_soon(self, lead_id: str) -> None:
+        await asyncio.sleep(WRITE_COALESCE_SECONDS)
+        async with self._lead_lock(lead_id):
+            self._flush_tasks.pop(lead_id, None)
+            state = self._dirty.get(lead_id)
+            if state is not None:
+                self.save_lead_state(state)
+                
+    async def flush(self) -> None:
+        """Write every pending lead state now; call on shutdown so no tracked event is lost."""
+        # Tasks stranded on another (closed) loop can't be awaited here; their states are still dirty
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in self._flush_tasks.values() if task.get_loop() is loop]
+        self._flush_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for state in list(self._dirty.values()):
+            self.save_lead_state(state)
+            
     async def get_lead_score(self, lead_id: str) -> int:
         """Get a lead's current engagement score."""
-        state = self.get_lead_state(lead_id)
-        return state.engagement_score if state else 0
+        score = self._cached_score(lead_id)
+        return score if score is not None else 0
         
     async def should_pause_lead(self, lead_id: str, min_score: int = 0) -> bool:
         """Check if a lead should be paused based on engagement score."""
-        state = self.get_lead_state(lead_id)
-        if not state:
+        score = self._cached_score(lead_id)
+        if score is None:
             return False
-        return state.should_pause(min_score)
+        return score < min_score
         
     async def get_engagement_history(self, lead_id: str) -> list:
         """Get a lead's engagement history."""
         state = self.get_lead_state(lead_id)
         if not state:
             return []
-        return [event.dict() for event in state.engagement_history]
+        return [event.model_dump() for event in state.engagement_history]
         
     async def reset_lead_score(self, lead_id: str) -> None:
         """Reset a lead's engagement score."""
-        state = self.get_lead_state(lead_id)
-        if not state:
-            return
-            
-        state.engagement_score = 0
-        state.engagement_history = []
-        self.save_lead_state(state)
+        async with self._lead_lock(lead_id):
+            state = self.get_lead_state(lead_id)
+            if not state:
+                return
+                
+            state.engagement_score = 0
+            state.engagement_history = []
+            self.save_lead_state(state)
         
         # Update metrics
         LEAD_SCORES.labels(
@@ -181,4 +287,9 @@ class EngagementTracker:
         self.logger.info(
             "Lead score reset",
             lead_id=lead_id
-        ) 
\ No newline at end of file
+        )
+
+@lru_cache()
+def get_engagement_tracker() -> EngagementTracker:
+    """Get shared engagement tracker instance."""
+    return EngagementTracker()
@@ -1,12 +1,65 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+from threading import RLock
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from cachetools import LRUCache, TTLCache
+from prometheus_client import Counter
 from neonhub.schemas.linkedin_lead import LinkedInProfile
+from neonhub.utils.logging import get_logger
+
+PROFILE_CACHE_LOOKUPS = Counter(
+    'neonhub_linkedin_profile_cache_lookups_total',
+    'LinkedIn profile cache lookups',
+    ['result']
+)
+
+PROFILE_CACHE_SIZE = 100_000
+PROFILE_CACHE_STRIPES = 32  # must be a power of two
+ENRICH_CONCURRENCY = 10
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL = 3600  # seconds
+
+# Blocking SerpAPI-style search: params -> result dict, e.g. GoogleSearch(params).get_dict()
+SearchClient = Callable[[Dict[str, Any]], Dict[str, Any]]
 
 class LinkedInScraper:
-    def __init__(self):
-        self._profiles: Dict[str, LinkedInProfile] = {}
+    def __init__(self, search_client: Optional[SearchClient] = None):
+        self._search_client = search_client
+        self.logger = get_logger()
+        self._search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        # Striped LRU: each stripe owns its own cache and lock, so concurrent
+        # saves/loads of different profiles rarely contend and memory stays bounded
+        stripe_size = PROFILE_CACHE_SIZE // PROFILE_CACHE_STRIPES
+        self._profiles: List[LRUCache] = [LRUCache(maxsize=stripe_size) for _ in range(PROFILE_CACHE_STRIPES)]
+        self._locks: List[RLock] = [RLock() for _ in range(PROFILE_CACHE_STRIPES)]
+        self._cache_hits = PROFILE_CACHE_LOOKUPS.labels(result="hit")
+        self._cache_misses = PROFILE_CACHE_LOOKUPS.labels(result="miss")
+
+    def _stripe(self, profile_id: str) -> int:
+        return hash(profile_id) & (PROFILE_CACHE_STRIPES - 1)
+
+    async def _search(self, key: Tuple, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Blocking client runs in a worker thread; results are reused per normalized query
+        data = self._search_cache.get(key)
+        if data is None:
+            data = await asyncio.to_thread(self._search_client, params)
+            self._search_cache[key] = data
+        return data
 
     async def search_profiles(self, keywords: List[str], location: Optional[str] = None) -> List[LinkedInProfile]:
+        if self._search_client is not None:
+            # One normalized form drives both the cache key and the query sent upstream
+            terms = tuple(sorted(k.strip().lower() for k in keywords))
+            place = location.strip().lower() if location else None
+            try:
+                data = await self._search(
+                    ("profiles", terms, place),
+                    {"engine": "linkedin_profiles", "q": " ".join(terms), "location": place}
+                )
+            except Exception as e:
+                self.logger.error("Profile search failed", keywords=keywords, location=location, error=str(e))
+                return []
+            return [LinkedInProfile(**p) for p in data.get("profiles", [])]
+
         # Mocked search logic
         if keywords == ["software engineer"] and location == "San Francisco":
             return [LinkedInProfile(
@@ -20,17 +73,55 @@ class LinkedInScraper:
             )]
         return []
 
+    async def _fetch_company_meta(self, profile: LinkedInProfile) -> str:
+        # Mock company size lookup
+        return "1000+"
+
+    async def _fetch_experience(self, profile: LinkedInProfile) -> Tuple[str, List[Dict[str, str]]]:
+        # Mock about/experience lookup
+        return "Experienced software engineer", [{"title": "Senior Engineer", "company": "Tech Corp", "duration": "2 years"}]
+
+    async def _fetch_education(self, profile: LinkedInProfile) -> List[Dict[str, str]]:
+        # Mock education lookup
+        return [{"school": "Stanford", "degree": "BS Computer Science"}]
+
+    async def _fetch_skills(self, profile: LinkedInProfile) -> List[str]:
+        # Mock skills lookup
+        return ["Python", "JavaScript"]
+
+    async def _fetch_photo(self, profile: LinkedInProfile) -> str:
+        # Mock profile photo lookup
+        return "https://example.com/photo.jpg"
+
     async def enrich_profile(self, profile: LinkedInProfile) -> LinkedInProfile:
-        # Mock enrichment
-        profile.company_size = "1000+"
-        profile.about = "Experienced software engineer"
-        profile.experience = [{"title": "Senior Engineer", "company": "Tech Corp", "duration": "2 years"}]
-        profile.education = [{"school": "Stanford", "degree": "BS Computer Science"}]
-        profile.skills = ["Python", "JavaScript"]
-        profile.profile_image_url = "https://example.com/photo.jpg"
+        # Independent lookups, fetched concurrently
+        company_size, (about, experience), education, skills, photo = await asyncio.gather(
+            self._fetch_company_meta(profile),
+            self._fetch_experience(profile),
+            self._fetch_education(profile),
+            self._fetch_skills(profile),
+            self._fetch_photo(profile)
+        )
+        profile.company_size = company_size
+        profile.about = about
+        profile.experience = experience
+        profile.education = education
+        profile.skills = skills
+        profile.profile_image_url = photo
         return profile
 
     async def get_company_info(self, company_name: str) -> Dict[str, Any]:
+        if self._search_client is not None:
+            try:
+                data = await self._search(
+                    ("company", company_name.strip().lower()),
+                    {"engine": "linkedin_company", "q": company_name}
+                )
+            except Exception as e:
+                self.logger.error("Company search failed", company=company_name, error=str(e))
+                return {}
+            return dict(data.get("company", {}))  # copy: the payload is cached
+
         # Mock company info
         if company_name == "Tech Corp":
             return {
@@ -45,19 +136,53 @@ class LinkedInScraper:
         return {}
 
     async def get_company_employees(self, company_name: str) -> List[LinkedInProfile]:
+        if self._search_client is not None:
+            try:
+                data = await self._search(
+                    ("employees", company_name.strip().lower()),
+                    {"engine": "linkedin_employees", "q": company_name}
+                )
+            except Exception as e:
+                self.logger.error("Employee search failed", company=company_name, error=str(e))
+                return []
+            employees = [
+                LinkedInProfile(**{"company": company_name, **p})
+                for p in data.get("employees", [])
+            ]
         # Mock employees
-        if company_name == "Tech Corp":
-            return [LinkedInProfile(
+        elif company_name == "Tech Corp":
+            employees = [LinkedInProfile(
                 profile_id="profile_1",
                 name="John Doe",
                 title="Software Engineer",
                 company="Tech Corp",
                 profile_url="https://linkedin.com/in/johndoe"
             )]
-        return []
+        else:
+            employees = []
+        if not employees:
+            return []
+
+        # Hydrate employees concurrently, capped to avoid hammering the source
+        semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+
+        async def _enrich(profile: LinkedInProfile) -> LinkedInProfile:
+            async with semaphore:
+                return await self.enrich_profile(profile)
+
+        return list(await asyncio.gather(*(_enrich(p) for p in employees)))
 
     def save_profile(self, profile: LinkedInProfile) -> None:
-        self._profiles[profile.profile_id] = profile
+        i = self._stripe(profile.profile_id)
+        with self._locks[i]:
+            self._profiles[i][profile.profile_id] = profile
 
     def load_profile(self, profile_id: str) -> Optional[LinkedInProfile]:
-        return self._profiles.get(profile_id) 
\ No newline at end of file
+        i = self._stripe(profile_id)
+        with self._locks[i]:
+            profile = self._profiles[i].get(profile_id)
+        if profile is None:
+            self._cache_misses.inc()
+        else:
+            self._cache_hits.inc()
+        return profile 
\ No newline at end of file
@@ -1,15 +1,17 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from prometheus_client import Counter, Histogram
+from pydantic import TypeAdapter
+import copy
 import json
 from pathlib import Path
 
 from ..schemas.lead_state import LeadState, SequenceStage, LeadStatus
-from ..services.content_personalizer import ContentPersonalizer
-from ..services.engagement_tracker import EngagementTracker
+from ..services.content_personalizer import get_content_personalizer
+from ..services.engagement_tracker import get_engagement_tracker
 from ..utils.logging import get_logger
 from ..config.settings import get_settings
-from neonhub.services.trigger_manager import TriggerManager
+from neonhub.services.trigger_manager import get_trigger_manager
 
 # Prometheus metrics
 SEQUENCE_PROGRESS = Counter(
@@ -24,31 +26,45 @@ SEQUENCE_DURATION = Histogram(
     ['campaign_id', 'stage_id']
 )
 
+_STAGES_ADAPTER = TypeAdapter(List[SequenceStage])
+
 class SequenceManager:
     """Service for managing multi-stage outreach sequences."""
     
-    def __init__(self):
+    def __init__(self, clock: Callable[[], datetime] = datetime.utcnow):
+        self._clock = clock  # injectable so stage delays can be tested without waiting
         self.settings = get_settings()
         self.logger = get_logger()
-        self.content_personalizer = ContentPersonalizer()
-        self.engagement_tracker = EngagementTracker()
+        self.content_personalizer = get_content_personalizer()
+        self.engagement_tracker = get_engagement_tracker()
         self.sequences_dir = Path("data/sequences")
         self.sequences_dir.mkdir(parents=True, exist_ok=True)
-        self.trigger_manager = TriggerManager()
+        self._seq_cache: Dict[str, Tuple[float, Dict]] = {}  # campaign_id -> (mtime, sequence)
+        self.trigger_manager = get_trigger_manager()
         
     def _get_sequence_path(self, campaign_id: str) -> Path:
         """Get the path for a campaign's sequence file."""
         return self.sequences_dir / f"{campaign_id}.json"
         
     def get_sequence(self, campaign_id: str) -> Optional[Dict]:
-        """Load a campaign sequence from disk."""
+        """Load a campaign sequence from disk, reusing the cached copy while the file is unchanged."""
         sequence_path = self._get_sequence_path(campaign_id)
-        if not sequence_path.exists():
+        try:
+            mtime = sequence_path.stat().st_mtime
+        except FileNotFoundError:
+            self._seq_cache.pop(campaign_id, None)
             return None
             
+        # Callers get their own copy, so mutating a result can't corrupt the cache
+        cached = self._seq_cache.get(campaign_id)
+        if cached and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
+            
         try:
             with open(sequence_path, "r") as f:
-                return json.load(f)
+                sequence = json.load(f)
+            self._seq_cache[campaign_id] = (mtime, sequence)
+            return copy.deepcopy(sequence)
         except Exception as e:
             self.logger.error(
                 "Failed to load sequence",
@@ -63,6 +79,7 @@ class SequenceManager:
             sequence_path = self._get_sequence_path(campaign_id)
             with open(sequence_path, "w") as f:
                 json.dump(sequence, f, indent=2)
+            self._seq_cache.pop(campaign_id, None)
         except Exception as e:
             self.logger.error(
                 "Failed to save sequence",
@@ -77,15 +94,16 @@ class SequenceManager:
         sequence: Dict
     ) -> LeadState:
         """Initialize a lead's sequence state."""
-        # Create sequence stages
-        stages = []
-        for stage in sequence["stages"]:
-            stages.append(SequenceStage(
-                stage_id=stage["id"],
-                template_id=stage["template_id"],
-                delay_hours=stage["delay_hours"],
-                max_attempts=stage.get("max_attempts", 3)
-            ))
+        # Create sequence stages (validated in a single pass)
+        stages = _STAGES_ADAPTER.validate_python([
+            {
+                "stage_id": stage["id"],
+                "template_id": stage["template_id"],
+                "delay_hours": stage["delay_hours"],
+                "max_attempts": stage.get("max_attempts", 3)
+            }
+            for stage in sequence["stages"]
+        ])
             
         # Create lead state
         state = LeadState(
@@ -125,7 +143,7 @@ class SequenceManager:
         # Check if we should wait for delay
         if current_stage.completed_at:
             delay_until = current_stage.completed_at + timedelta(hours=current_stage.delay_hours)
-            if datetime.utcnow() < delay_until:
+            if self._clock() < delay_until:
                 return None
                 
         # Check if lead should be paused
@@ -135,7 +153,7 @@ class SequenceManager:
             return None
             
         # Get content for next action
-        content = await self.content_personalizer.generate_content(
+        content = self.content_personalizer.generate_content(
             current_stage.template_id,
             {"lead_id": lead_id},
             "segment_score"
@@ -171,7 +189,7 @@ class SequenceManager:
             return
             
         if success:
-            state.complete_current_stage()
+            state.complete_current_stage(self._clock())
             
             # Check if sequence is complete
             if state.current_stage >= len(state.sequence_stages):
@@ -195,14 +213,13 @@ class SequenceManager:
         
         # --- Trigger System Integration ---
         try:
-            latest_state = self.engagement_tracker.get_lead_state(lead_id)
-            self.trigger_manager.evaluate_and_trigger(latest_state)
+            self.trigger_manager.evaluate_and_trigger(state)
             self.logger.info(
                 "Trigger evaluation after stage advancement",
                 lead_id=lead_id,
                 campaign_id=campaign_id,
-                stage=latest_state.current_stage,
-                status=latest_state.status
+                stage=state.current_stage,
+                status=state.status
             )
         except Exception as e:
             self.logger.error(
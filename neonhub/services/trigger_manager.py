@@ -1,13 +1,17 @@
 from typing import Optional, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from functools import lru_cache
+import time
 import threading
 import logging
+from pathlib import Path
+import orjson
 from prometheus_client import Counter
 
 from neonhub.schemas.lead_state import LeadState
 from neonhub.schemas.message_event import MessageChannel, MessageType, MessageStatus
-from messaging.personal_messenger import PersonalMessenger
-from neonhub.services.content_personalizer import ContentPersonalizer
+from messaging.personal_messenger import get_personal_messenger
+from neonhub.services.content_personalizer import get_content_personalizer
 from neonhub.utils.logging import get_logger
 from neonhub.config.settings import get_settings
 
@@ -24,15 +28,21 @@ TRIGGERS_SUPPRESSED = Counter(
 
 TRIGGER_LOG_PATH = "logs/trigger_events.log"
 
+_dumps = orjson.dumps
+
+REPLY_EVENT_TYPES = frozenset({"email_reply", "linkedin_reply", "sms_reply", "whatsapp_reply"})
+
 class TriggerManager:
     def __init__(self):
         self.settings = get_settings()
         self.logger = get_logger()
-        self.messenger = PersonalMessenger()
-        self.personalizer = ContentPersonalizer()
-        self.cooldowns = {}  # lead_id -> {channel: last_trigger_time}
+        self.messenger = get_personal_messenger()
+        self.personalizer = get_content_personalizer()
+        self.cooldowns: Dict[str, Dict[str, int]] = {}  # lead_id -> {channel: last trigger, monotonic ns}
         self.lock = threading.Lock()
         self.trigger_log = TRIGGER_LOG_PATH
+        self._log_fh = None
+        self._log_lock = threading.Lock()  # one writer at a time on the shared handle
 
     def _log_trigger(self, lead_id: str, trigger_type: str, channel: str, status: str, details: Dict):
         event = {
@@ -43,38 +53,70 @@ class TriggerManager:
             "status": status,
             "details": details
         }
+        line = _dumps(event, option=orjson.OPT_APPEND_NEWLINE)
         try:
-            with open(self.trigger_log, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event) + "\n")
+            with self._log_lock:
+                if self._log_fh is None:
+                    Path(self.trigger_log).parent.mkdir(parents=True, exist_ok=True)
+                    self._log_fh = open(self.trigger_log, "ab")
+                self._log_fh.write(line)
+                self._log_fh.flush()
         except Exception as e:
             self.logger.error("Failed to log trigger event", error=str(e))
 
+    def close(self):
+        """Close the trigger log handle; a later event reopens it."""
+        with self._log_lock:
+            if self._log_fh is not None:
+                self._log_fh.close()
+                self._log_fh = None
+
     def _can_trigger(self, lead_id: str, channel: str, cooldown_minutes: int = 60) -> bool:
         with self.lock:
-            now = datetime.utcnow()
-            last = self.cooldowns.get(lead_id, {}).get(channel)
-            if last and (now - last) < timedelta(minutes=cooldown_minutes):
+            now = time.monotonic_ns()
+            channels = self.cooldowns.setdefault(lead_id, {})
+            last = channels.get(channel)
+            if last is not None and now - last < cooldown_minutes * 60_000_000_000:
                 return False
-            self.cooldowns.setdefault(lead_id, {})[channel] = now
+            channels[channel] = now
             return True
 
     def evaluate_and_trigger(self, lead_state: LeadState):
         lead_id = lead_state.lead_id
-        persona = lead_state.metadata.get("persona")
-        lang = lead_state.metadata.get("lang", "en")
-        phone = lead_state.metadata.get("phone")
-        whatsapp = lead_state.metadata.get("whatsapp")
-        email = lead_state.metadata.get("email")
+        metadata = lead_state.metadata
         score = lead_state.engagement_score
-        status = lead_state.status
-        events = lead_state.engagement_history
-        now = datetime.utcnow()
-
-        # Rule 1: Abandoned cart (metadata['cart_abandoned_at'])
-        cart_abandoned_at = lead_state.metadata.get("cart_abandoned_at")
-        if cart_abandoned_at:
-            abandoned_time = datetime.fromisoformat(cart_abandoned_at)
-            if (now - abandoned_time) > timedelta(minutes=60):
+
+        # Rule preconditions, read from the per-event-type counts (no history scan)
+        counts = lead_state.event_counts()
+        email_sends = counts.get("email_sent", 0)
+        has_reply = any(counts.get(t) for t in REPLY_EVENT_TYPES)
+        has_unsubscribe = counts.get("unsubscribe", 0) > 0
+        cart_abandoned_ts = metadata.get("cart_abandoned_at_ts")
+        cart_abandoned_at = metadata.get("cart_abandoned_at")
+        has_cart = bool(cart_abandoned_ts or cart_abandoned_at)
+        is_cold = score < 3 and email_sends >= 2
+
+        if not (has_cart or is_cold or has_reply or has_unsubscribe):
+            self._log_trigger(lead_id, "no_trigger", "none", "skipped", {})
+            return None
+
+        persona = metadata.get("persona")
+        lang = metadata.get("lang", "en")
+        phone = metadata.get("phone")
+        whatsapp = metadata.get("whatsapp")
+
+        # Rule 1: Abandoned cart (metadata['cart_abandoned_at_ts'], ISO 'cart_abandoned_at' for older states)
+        if has_cart:
+            if cart_abandoned_ts:
+                abandoned_epoch = int(cart_abandoned_ts)
+            else:
+                # Older states only carry the ISO value (naive UTC); evaluation never mutates the state
+                abandoned_at = datetime.fromisoformat(cart_abandoned_at)
+                if abandoned_at.tzinfo is None:
+                    abandoned_at = abandoned_at.replace(tzinfo=timezone.utc)
+                abandoned_epoch = abandoned_at.timestamp()
+            abandoned_seconds = time.time() - abandoned_epoch
+            if abandoned_seconds > 3600:
                 if whatsapp and self._can_trigger(lead_id, "whatsapp", cooldown_minutes=120):
                     content = self.personalizer.generate_content(
                         template_id="mobile_demo_whatsapp",
@@ -95,8 +137,7 @@ class TriggerManager:
                     self._log_trigger(lead_id, "cart_recovery", "whatsapp", "suppressed", {"reason": "cooldown or missing whatsapp"})
 
         # Rule 2: Low engagement after 2 emails
-        email_sends = [e for e in events if e.event_type == "email_sent"]
-        if score < 3 and len(email_sends) >= 2:
+        if is_cold:
             if phone and self._can_trigger(lead_id, "sms", cooldown_minutes=180):
                 content = self.personalizer.generate_content(
                     template_id="mobile_demo_sms",
@@ -117,19 +158,22 @@ class TriggerManager:
                 self._log_trigger(lead_id, "cold_lead_nudge", "sms", "suppressed", {"reason": "cooldown or missing phone"})
 
         # Rule 3: Reply received (pause triggers)
-        reply_events = [e for e in events if e.event_type in ("email_reply", "linkedin_reply", "sms_reply", "whatsapp_reply")]
-        if reply_events:
+        if has_reply:
             TRIGGERS_SUPPRESSED.labels(reason="reply_received").inc()
             self._log_trigger(lead_id, "reply_ack", "all", "suppressed", {"reason": "reply received"})
             return None
 
         # Rule 4: Unsubscribe (pause triggers)
-        unsubscribe_events = [e for e in events if e.event_type == "unsubscribe"]
-        if unsubscribe_events:
+        if has_unsubscribe:
             TRIGGERS_SUPPRESSED.labels(reason="unsubscribed").inc()
             self._log_trigger(lead_id, "unsubscribe", "all", "suppressed", {"reason": "unsubscribed"})
             return None
 
         # No trigger fired
         self._log_trigger(lead_id, "no_trigger", "none", "skipped", {})
-        return None 
\ No newline at end of file
+        return None 
+
+@lru_cache()
+def get_trigger_manager() -> TriggerManager:
+    """Get shared trigger manager instance."""
+    return TriggerManager()
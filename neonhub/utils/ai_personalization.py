@@ -1,14 +1,46 @@
 from typing import Dict, Any, Optional
-import openai
+import os
+from openai import AsyncOpenAI
 from datetime import datetime
+from string import Template
+
+_DEFAULT_KEY = os.getenv("OPENAI_API_KEY")
+
+# Static prompt scaffolding, parsed once at import; only the slots vary per call
+_PROMPT_TMPL = Template("""
+        Please personalize the following email template for a B2B outreach campaign.
+        
+        Template Name: ${template_name}
+        
+        Recipient Information:
+        - Company: ${company}
+        - Industry: ${industry}
+        - Location: ${city}, ${country}
+        - Contact Name: ${contact_name}
+        
+        Context:
+        - Campaign Goal: ${campaign_goal}
+        - Previous Interactions: ${previous_interactions}
+        - Special Notes: ${special_notes}
+        
+        Please provide:
+        1. A personalized subject line
+        2. A personalized email body that maintains the core message while adding relevant personal touches
+        3. Keep the HTML formatting intact
+        4. Ensure the tone is professional but conversational
+        
+        Format your response as:
+        SUBJECT: [personalized subject]
+        BODY: [personalized body]
+        """)
 
 class AIPersonalizer:
     """Handles AI-powered personalization of email content."""
     
     def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        if self.api_key:
-            openai.api_key = self.api_key
+        self.api_key = api_key or _DEFAULT_KEY
+        # Per-instance client; avoids mutating the global openai.api_key
+        self._client = AsyncOpenAI(api_key=self.api_key) if self.api_key else None
             
     async def personalize(
         self,
@@ -17,6 +49,13 @@ class AIPersonalizer:
         context: Dict[str, Any]
     ) -> Dict[str, str]:
         """Personalize email content using AI."""
+        if self._client is None:
+            return self._fallback_personalization(
+                template_name,
+                recipient_data,
+                context
+            )
+            
         try:
             # Prepare the prompt for the AI
             prompt = self._create_personalization_prompt(
@@ -26,7 +65,7 @@ class AIPersonalizer:
             )
             
             # Get AI response
-            response = await openai.ChatCompletion.acreate(
+            response = await self._client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are an expert email personalization assistant. Your task is to personalize email content while maintaining professionalism and relevance."},
@@ -59,32 +98,18 @@ class AIPersonalizer:
         context: Dict[str, Any]
     ) -> str:
         """Create a prompt for the AI to personalize the email."""
-        return f"""
-        Please personalize the following email template for a B2B outreach campaign.
-        
-        Template Name: {template_name}
-        
-        Recipient Information:
-        - Company: {recipient_data.get('company_name', 'N/A')}
-        - Industry: {recipient_data.get('industry', 'N/A')}
-        - Location: {recipient_data.get('location', {}).get('city', 'N/A')}, {recipient_data.get('location', {}).get('country', 'N/A')}
-        - Contact Name: {recipient_data.get('contact_name', 'N/A')}
-        
-        Context:
-        - Campaign Goal: {context.get('campaign_goal', 'N/A')}
-        - Previous Interactions: {context.get('previous_interactions', 'None')}
-        - Special Notes: {context.get('special_notes', 'None')}
-        
-        Please provide:
-        1. A personalized subject line
-        2. A personalized email body that maintains the core message while adding relevant personal touches
-        3. Keep the HTML formatting intact
-        4. Ensure the tone is professional but conversational
-        
-        Format your response as:
-        SUBJECT: [personalized subject]
-        BODY: [personalized body]
-        """
+        location = recipient_data.get('location', {})
+        return _PROMPT_TMPL.substitute(
+            template_name=template_name,
+            company=recipient_data.get('company_name', 'N/A'),
+            industry=recipient_data.get('industry', 'N/A'),
+            city=location.get('city', 'N/A'),
+            country=location.get('country', 'N/A'),
+            contact_name=recipient_data.get('contact_name', 'N/A'),
+            campaign_goal=context.get('campaign_goal', 'N/A'),
+            previous_interactions=context.get('previous_interactions', 'None'),
+            special_notes=context.get('special_notes', 'None')
+        )
         
     def _parse_ai_response(
         self,
@@ -1,19 +1,145 @@
 from typing import Dict, Any, List, Optional
+import asyncio
 import re
+import threading
+import time
+import dns.exception
 import dns.resolver
+from cachetools import TTLCache
 from email_validator import validate_email, EmailNotValidError
+from prometheus_client import Counter
 import requests
-from urllib.parse import urlparse
+from neonhub.utils.timestamps import iso_from_ns
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+URL_RE = re.compile(r'^https?://[^\s/]+', re.IGNORECASE)
+
+# Confidence score by populated-field bitmask: 0.2 per field present
+_CONFIDENCE_SCORES = tuple(round(bin(mask).count("1") * 0.2, 1) for mask in range(32))
+
+# Prometheus metrics
+MX_CACHE_LOOKUPS = Counter(
+    'neonhub_mx_cache_lookups_total',
+    'MX record cache lookups',
+    ['result']
+)
+
+MX_CACHE_EVICTIONS = Counter(
+    'neonhub_mx_cache_evictions_total',
+    'MX record cache entries evicted to make room'
+)
+
+class _MXCache(TTLCache):
+    """TTL cache of domain -> has MX records, counting capacity evictions."""
+    
+    def popitem(self):
+        item = super().popitem()
+        MX_CACHE_EVICTIONS.inc()
+        return item
+
+_MX_CACHE = _MXCache(maxsize=1000, ttl=300)
+_MX_LOCK = threading.Lock()  # lookups resolve on worker threads
+_MX_HIT = MX_CACHE_LOOKUPS.labels(result="hit")
+_MX_MISS = MX_CACHE_LOOKUPS.labels(result="miss")
+
+# One shared resolver (and its answer cache) for every lookup in the process
+_RESOLVER = dns.resolver.Resolver()
+_RESOLVER.cache = dns.resolver.LRUCache(max_size=10_000)
+
+def _resolve_mx(domain: str) -> bool:
+    """Blocking MX lookup; caches definite answers per domain."""
+    try:
+        has_mx = bool(_RESOLVER.resolve(domain, "MX"))
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        has_mx = False
+    except dns.exception.DNSException:
+        # Transient resolver failure; don't reject the lead or cache the miss
+        return True
+        
+    with _MX_LOCK:
+        _MX_CACHE[domain] = has_mx
+    return has_mx
+
+async def _domain_has_mx(domain: str) -> bool:
+    """Check whether a domain accepts mail, caching the answer per domain."""
+    with _MX_LOCK:
+        has_mx = _MX_CACHE.get(domain)
+    if has_mx is not None:
+        _MX_HIT.inc()
+        return has_mx
+        
+    _MX_MISS.inc()
+    return await asyncio.to_thread(_resolve_mx, domain)
+
+def _email_domain(lead_data: Dict[str, Any]) -> Optional[str]:
+    email = lead_data.get("contact_info", {}).get("email")
+    return email.rsplit("@", 1)[1].lower() if email else None
 
 class LeadValidator:
     """Validates and enriches lead data."""
     
-    def __init__(self):
-        self.email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-        self.phone_pattern = re.compile(r'^\+?1?\d{9,15}$')
+    async def validate(self, lead_data: Dict[str, Any], deep: bool = False) -> bool:
+        """Validate lead data and return True if valid.
+        
+        Cheap syntactic checks always run first; with ``deep=True`` the
+        expensive email checks (normalization, MX lookup) run only once
+        everything else has passed.
+        """
+        try:
+            if not self._passes_cheap_checks(lead_data):
+                return False
+                
+            if deep and not await self.deep_validate(lead_data):
+                return False
+                
+            # Enrich lead data
+            await self._enrich_lead_data(lead_data)
+            
+            return True
+            
+        except Exception as e:
+            return False
+            
+    async def validate_many(
+        self,
+        leads: List[Dict[str, Any]],
+        deep: bool = False,
+        max_concurrency: int = 64
+    ) -> List[bool]:
+        """Validate a batch of leads concurrently, in input order."""
+        if deep:
+            # Resolve each distinct domain once, and only for leads that can still pass
+            domains = {
+                _email_domain(lead)
+                for lead in leads
+                if self._passes_cheap_checks(lead)
+            }
+            domains.discard(None)
+            await asyncio.gather(*(_domain_has_mx(domain) for domain in domains))
+            
+        sem = asyncio.Semaphore(max_concurrency)
+        
+        async def _one(lead: Dict[str, Any]) -> bool:
+            async with sem:
+                return await self.validate(lead, deep=deep)
+                
+        return await asyncio.gather(*(_one(lead) for lead in leads))
+        
+    async def deep_validate(self, lead_data: Dict[str, Any]) -> bool:
+        """Run the expensive email checks on a lead that passed the cheap tier."""
+        email = lead_data.get("contact_info", {}).get("email")
+        if not email:
+            return True
+            
+        try:
+            validate_email(email, check_deliverability=False)
+        except EmailNotValidError:
+            return False
+        return await _domain_has_mx(_email_domain(lead_data))
         
-    async def validate(self, lead_data: Dict[str, Any]) -> bool:
-        """Validate lead data and return True if valid."""
+    def _passes_cheap_checks(self, lead_data: Dict[str, Any]) -> bool:
+        """Run the syntactic checks, cheapest first."""
         try:
             # Check required fields
             if not self._check_required_fields(lead_data):
@@ -28,17 +154,10 @@ class LeadValidator:
                 return False
                 
             # Validate website
-            if not self._validate_website(lead_data.get("website")):
-                return False
-                
-            # Enrich lead data
-            await self._enrich_lead_data(lead_data)
-            
-            return True
-            
-        except Exception as e:
+            return self._validate_website(lead_data.get("website"))
+        except Exception:
             return False
-            
+        
     def _check_required_fields(self, lead_data: Dict[str, Any]) -> bool:
         """Check if all required fields are present."""
         required_fields = [
@@ -68,17 +187,14 @@ class LeadValidator:
         """Validate contact information."""
         contact_info = lead_data.get("contact_info", {})
         
-        # Validate email if present
+        # Validate email syntax if present; see deep_validate for the rest
         email = contact_info.get("email")
-        if email:
-            try:
-                validate_email(email)
-            except EmailNotValidError:
-                return False
+        if email and not EMAIL_RE.match(email):
+            return False
                 
         # Validate phone if present
         phone = contact_info.get("phone")
-        if phone and not self.phone_pattern.match(phone):
+        if phone and not PHONE_RE.match(phone):
             return False
             
         return True
@@ -88,16 +204,12 @@ class LeadValidator:
         if not website:
             return True  # Website is optional
             
-        try:
-            result = urlparse(website)
-            return all([result.scheme, result.netloc])
-        except:
-            return False
+        return bool(URL_RE.match(website))
             
     async def _enrich_lead_data(self, lead_data: Dict[str, Any]) -> None:
         """Enrich lead data with additional information."""
         # Add timestamp
-        lead_data["validated_at"] = datetime.utcnow().isoformat()
+        lead_data["validated_at"] = iso_from_ns(time.time_ns())
         
         # Add confidence score
         lead_data["confidence_score"] = self._calculate_confidence_score(lead_data)
@@ -107,23 +219,12 @@ class LeadValidator:
         
     def _calculate_confidence_score(self, lead_data: Dict[str, Any]) -> float:
         """Calculate confidence score for the lead."""
-        score = 0.0
-        
-        # Company name
-        if lead_data.get("company_name"):
-            score += 0.2
-            
-        # Location
-        if lead_data.get("location", {}).get("city"):
-            score += 0.2
-            
-        # Contact info
         contact_info = lead_data.get("contact_info", {})
-        if contact_info.get("email"):
-            score += 0.2
-        if contact_info.get("phone"):
-            score += 0.2
-        if contact_info.get("linkedin_url"):
-            score += 0.2
-            
-        return min(score, 1.0) 
\ No newline at end of file
+        mask = (
+            bool(lead_data.get("company_name"))
+            | bool(lead_data.get("location", {}).get("city")) << 1
+            | bool(contact_info.get("email")) << 2
+            | bool(contact_info.get("phone")) << 3
+            | bool(contact_info.get("linkedin_url")) << 4
+        )
+        return _CONFIDENCE_SCORES[mask]
@@ -1,29 +1,79 @@
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import mmap
 import os
 from pathlib import Path
+import orjson
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, Template
+
+JINJA_CACHE_SUBDIR = ".jinja_cache"  # under templates_dir unless cache_dir is given
+
+def _read_template(path: Path) -> Dict[str, Any]:
+    """Parse a template file straight from a read-only memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Empty template file: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return orjson.loads(mm)
+
+def _write_template(path: Path, template_data: Dict[str, Any]) -> None:
+    path.write_bytes(orjson.dumps(template_data, option=orjson.OPT_INDENT_2))
 
 class EmailTemplate:
     """Manages email templates and their variations."""
     
-    def __init__(self, templates_dir: str = "templates/email"):
+    def __init__(self, templates_dir: str = "templates/email", cache_dir: Optional[str] = None):
         self.templates_dir = Path(templates_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.templates_dir / JINJA_CACHE_SUBDIR
         self.templates: Dict[str, Dict[str, Any]] = {}
-        
+        # Sources are exposed to Jinja through a DictLoader so compiled bytecode
+        # can be persisted (from_string templates bypass the bytecode cache).
+        self._sources: Dict[str, str] = {}
+        self._compiled: Dict[str, Tuple[Template, Template]] = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._env = Environment(
+            loader=DictLoader(self._sources),
+            cache_size=-1,
+            bytecode_cache=FileSystemBytecodeCache(str(self.cache_dir))
+        )
+
     async def load_templates(self) -> None:
         """Load all email templates from the templates directory."""
-        if not self.templates_dir.exists():
-            self.templates_dir.mkdir(parents=True)
+        templates = await asyncio.to_thread(self._load_templates_sync)
+        self.templates.update(templates)
+        for template_data in templates.values():
+            self._compile(template_data)
+
+    def _load_templates_sync(self) -> Dict[str, Dict[str, Any]]:
+        # The directory itself may already exist (the bytecode cache lives in it),
+        # so seed defaults whenever it holds no template files
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        if not any(self.templates_dir.glob("*.json")):
             self._create_default_templates()
-            
+
+        templates = {}
         for template_file in self.templates_dir.glob("*.json"):
-            with open(template_file, "r", encoding="utf-8") as f:
-                template_data = json.load(f)
-                self.templates[template_data["name"]] = template_data
+            template_data = _read_template(template_file)
+            templates[template_data["name"]] = template_data
+        return templates
                 
     def get_template(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a specific template by name."""
         return self.templates.get(name)
+
+    def render(self, name: str, **variables) -> Tuple[str, str]:
+        """Render a template's (subject, body) with the given variables."""
+        subject, body = self._compiled[name]
+        return subject.render(**variables), body.render(**variables)
+
+    def _compile(self, template_data: Dict[str, Any]) -> None:
+        name = template_data["name"]
+        self._sources[f"{name}/subject"] = template_data["subject"]
+        self._sources[f"{name}/body"] = template_data["body"]
+        self._compiled[name] = (
+            self._env.get_template(f"{name}/subject"),
+            self._env.get_template(f"{name}/body")
+        )
         
     def _create_default_templates(self) -> None:
         """Create default email templates if none exist."""
@@ -93,9 +143,7 @@ class EmailTemplate:
         }
         
         for template_name, template_data in default_templates.items():
-            template_path = self.templates_dir / f"{template_name}.json"
-            with open(template_path, "w", encoding="utf-8") as f:
-                json.dump(template_data, f, indent=2)
+            _write_template(self.templates_dir / f"{template_name}.json", template_data)
                 
     def create_template(
         self,
@@ -112,8 +160,7 @@ class EmailTemplate:
             "variables": variables
         }
         
-        template_path = self.templates_dir / f"{name}.json"
-        with open(template_path, "w", encoding="utf-8") as f:
-            json.dump(template_data, f, indent=2)
+        _write_template(self.templates_dir / f"{name}.json", template_data)
             
-        self.templates[name] = template_data 
\ No newline at end of file
+        self.templates[name] = template_data
+        self._compile(template_data) 
\ No newline at end of file
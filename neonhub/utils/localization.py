@@ -1,6 +1,10 @@
 from typing import Any, Dict, List, Optional
-import json
+import asyncio
+import hashlib
+import threading
 from datetime import datetime
+import orjson
+from cachetools import LRUCache, TTLCache
 from prometheus_client import Counter, Histogram
 import openai
 from langdetect import detect
@@ -22,6 +26,27 @@ TRANSLATION_DURATION = Histogram(
     ['source_lang', 'target_lang']
 )
 
+# Process-local caches keyed by a digest of the source text, so repeated
+# template fields skip language detection and translation entirely
+_DETECT_CACHE: LRUCache = LRUCache(maxsize=4096)  # digest -> language
+_TX_CACHE: LRUCache = LRUCache(maxsize=4096)  # (digest, source, target) -> text
+_ADAPT_CACHE: TTLCache = TTLCache(maxsize=512, ttl=3600)  # (digest, target) -> adapted content
+_CACHE_LOCK = threading.Lock()
+
+# Content shorter than this (summed over all fields) is not worth an OpenAI round trip
+CULTURAL_ADAPTATION_MIN_CHARS = 40
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def _google_translate(text: str, source_language: str, target_language: str) -> str:
+    # GoogleTranslator keeps the query in per-instance params, so each
+    # worker thread needs its own instance
+    return GoogleTranslator(
+        source=source_language,
+        target=target_language
+    ).translate(text)
+
 class LocalizationService:
     """Service for handling content localization and translation."""
     
@@ -45,8 +70,17 @@ class LocalizationService:
         
     async def detect_language(self, text: str) -> str:
         """Detect the language of the given text."""
+        key = _text_key(text)
+        with _CACHE_LOCK:
+            language = _DETECT_CACHE.get(key)
+        if language is not None:
+            return language
+            
         try:
-            return detect(text)
+            language = detect(text)
+            with _CACHE_LOCK:
+                _DETECT_CACHE[key] = language
+            return language
         except Exception as e:
             self.logger.error(
                 "Language detection failed",
@@ -72,25 +106,25 @@ class LocalizationService:
             target_lang=target_language
         ).time():
             try:
-                translated_content = {}
+                keys = list(content.keys())
+                texts = list(content.values())
                 
                 # Detect source language from first content item
-                first_text = next(iter(content.values()))
-                source_language = await self.detect_language(first_text)
+                source_language = await self.detect_language(texts[0])
                 
-                # Translate each content item
-                for key, text in content.items():
-                    translated_text = await self._translate_text(
-                        text,
-                        source_language,
-                        target_language
-                    )
-                    translated_content[key] = translated_text
+                # Translate all content items in a single request
+                translated = await self._translate_batch(
+                    texts,
+                    source_language,
+                    target_language
+                )
+                translated_content = dict(zip(keys, translated))
                     
                 # Apply cultural adaptations
                 translated_content = await self._apply_cultural_adaptations(
                     translated_content,
-                    target_language
+                    target_language,
+                    source_language
                 )
                 
                 TRANSLATION_REQUESTS.labels(
@@ -114,12 +148,22 @@ class LocalizationService:
         target_language: str
     ) -> str:
         """Translate text using Google Translate API."""
+        key = (_text_key(text), source_language, target_language)
+        with _CACHE_LOCK:
+            translated = _TX_CACHE.get(key)
+        if translated is not None:
+            return translated
+            
         try:
-            translator = GoogleTranslator(
-                source=source_language,
-                target=target_language
+            translated = await asyncio.to_thread(
+                _google_translate,
+                text,
+                source_language,
+                target_language
             )
-            return translator.translate(text)
+            with _CACHE_LOCK:
+                _TX_CACHE[key] = translated
+            return translated
         except Exception as e:
             self.logger.error(
                 "Text translation failed",
@@ -127,12 +171,71 @@ class LocalizationService:
             )
             return text
             
+    async def _translate_batch(
+        self,
+        texts: List[str],
+        source_language: str,
+        target_language: str
+    ) -> List[str]:
+        """Translate several texts concurrently, one worker thread per uncached text."""
+        keys = [(_text_key(text), source_language, target_language) for text in texts]
+        with _CACHE_LOCK:
+            results = [_TX_CACHE.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+            
+        translated = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    _google_translate,
+                    texts[i],
+                    source_language,
+                    target_language
+                )
+                for i in missing
+            ),
+            return_exceptions=True
+        )
+        
+        with _CACHE_LOCK:
+            for i, text in zip(missing, translated):
+                if isinstance(text, Exception):
+                    self.logger.error(
+                        "Text translation failed",
+                        error=str(text)
+                    )
+                    results[i] = texts[i]
+                    continue
+                results[i] = text
+                _TX_CACHE[keys[i]] = text
+        return results
+            
     async def _apply_cultural_adaptations(
         self,
         content: Dict[str, str],
-        target_language: str
+        target_language: str,
+        source_language: Optional[str] = None
     ) -> Dict[str, str]:
         """Apply cultural adaptations to translated content."""
+        # Same-locale or trivially small content needs no adaptation
+        if target_language == source_language:
+            return content
+        if sum(len(value) for value in content.values()) < CULTURAL_ADAPTATION_MIN_CHARS:
+            return content
+            
+        key = (
+            hashlib.blake2b(
+                orjson.dumps(content, option=orjson.OPT_SORT_KEYS),
+                digest_size=16
+            ).digest(),
+            target_language
+        )
+        with _CACHE_LOCK:
+            cached = _ADAPT_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+            
         try:
             # Prepare prompt for cultural adaptation
             prompt = self._create_cultural_adaptation_prompt(
@@ -155,8 +258,10 @@ class LocalizationService:
             )
             
             # Parse and apply cultural adaptations
-            adapted_content = json.loads(response.choices[0].message.content)
-            return adapted_content
+            adapted_content = orjson.loads(response.choices[0].message.content)
+            with _CACHE_LOCK:
+                _ADAPT_CACHE[key] = adapted_content
+            return dict(adapted_content)
             
         except Exception as e:
             self.logger.error(
@@ -180,7 +285,7 @@ class LocalizationService:
         - Date and number formats
         - Units of measurement
         
-        Content: {json.dumps(content)}
+        Content: {orjson.dumps(content).decode()}
         Target language: {target_language}
         
         Return the culturally adapted content in the same JSON format.
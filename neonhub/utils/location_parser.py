@@ -1,28 +1,53 @@
 from typing import Dict, Any, Optional, Tuple
+import asyncio
 import re
+from cachetools import LRUCache
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+from geopy.extra.rate_limiter import RateLimiter
+
+LOCATION_RE = re.compile(
+    r'^(?P<city>[^,]+),\s*(?P<state>[^,]+)?,\s*(?P<country>[^,]+)$',
+    re.IGNORECASE
+)
+
+# Geocoding results keyed by normalized query; lead lists repeat cities a lot
+_GEO_CACHE: LRUCache = LRUCache(maxsize=10_000)
+
+def _geo_key(query: str) -> str:
+    return "|".join(part.strip().lower() for part in query.split(","))
 
 class LocationParser:
     """Parses and validates location information."""
     
     def __init__(self):
         self.geocoder = Nominatim(user_agent="neonhub_lead_scraper")
-        self.location_pattern = re.compile(
-            r'^(?P<city>[^,]+),\s*(?P<state>[^,]+)?,\s*(?P<country>[^,]+)$',
-            re.IGNORECASE
+        # Nominatim usage policy: at most one request per second (thread-safe)
+        self._geocode = RateLimiter(
+            self.geocoder.geocode,
+            min_delay_seconds=1,
+            swallow_exceptions=False
         )
         
-    def parse(self, location: str) -> Dict[str, Any]:
+    async def _geocode_cached(self, query: str):
+        """Geocode a query off the event loop, serving repeats from the cache."""
+        key = _geo_key(query)
+        if key in _GEO_CACHE:
+            return _GEO_CACHE[key]
+        result = await asyncio.to_thread(self._geocode, query)
+        _GEO_CACHE[key] = result
+        return result
+        
+    async def parse(self, location: str) -> Dict[str, Any]:
         """Parse location string into structured data."""
         try:
             # Try to parse using regex first
-            match = self.location_pattern.match(location)
+            match = LOCATION_RE.match(location)
             if match:
-                return self._parse_from_regex(match)
+                return await self._parse_from_regex(match)
                 
             # Fallback to geocoding
-            return self._parse_from_geocoding(location)
+            return await self._parse_from_geocoding(location)
             
         except Exception as e:
             # Return basic structure if parsing fails
@@ -33,7 +58,7 @@ class LocationParser:
                 "formatted_address": location
             }
             
-    def _parse_from_regex(self, match: re.Match) -> Dict[str, Any]:
+    async def _parse_from_regex(self, match: re.Match) -> Dict[str, Any]:
         """Parse location from regex match."""
         city = match.group("city").strip()
         state = match.group("state")
@@ -41,7 +66,7 @@ class LocationParser:
         
         # Try to get coordinates
         try:
-            location = self.geocoder.geocode(f"{city}, {country}")
+            location = await self._geocode_cached(f"{city}, {country}")
             coordinates = (location.latitude, location.longitude) if location else None
         except (GeocoderTimedOut, GeocoderServiceError):
             coordinates = None
@@ -54,11 +79,11 @@ class LocationParser:
             "formatted_address": f"{city}, {country}"
         }
         
-    def _parse_from_geocoding(self, location: str) -> Dict[str, Any]:
+    async def _parse_from_geocoding(self, location: str) -> Dict[str, Any]:
         """Parse location using geocoding service."""
         try:
             # Get location data
-            location_data = self.geocoder.geocode(location)
+            location_data = await self._geocode_cached(location)
             
             if not location_data:
                 return {
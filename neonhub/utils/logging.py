@@ -1,5 +1,5 @@
+import os
 import sys
-import uuid
 from typing import Any, Dict, Optional
 from loguru import logger
 from ..config.settings import get_settings
@@ -37,15 +37,19 @@ class TraceLogger:
     """Logger with trace ID for request tracking."""
     
     def __init__(self, trace_id: Optional[str] = None):
-        self.trace_id = trace_id or str(uuid.uuid4())
+        self.trace_id = trace_id or os.urandom(12).hex()
+        # Bind once; loguru carries trace_id in record["extra"] without per-call work.
+        # depth=2 attributes records to the caller of the level method, not _log.
+        self._bound = logger.bind(trace_id=self.trace_id)
+        self._emit = self._bound.opt(depth=2)
         
     def _log(self, level: str, message: str, **kwargs: Any) -> None:
         """Log message with trace ID."""
-        extra = kwargs.pop("extra", {})
-        extra["trace_id"] = self.trace_id
-        
-        log_func = getattr(logger, level.lower())
-        log_func(message, extra=extra, **kwargs)
+        emit = self._emit
+        extra = kwargs.pop("extra", None)
+        if extra:
+            emit = self._bound.bind(**extra).opt(depth=2)
+        getattr(emit, level)(message, **kwargs)
         
     def debug(self, message: str, **kwargs: Any) -> None:
         """Log debug message."""
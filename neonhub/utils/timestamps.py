@@ -0,0 +1,9 @@
+from datetime import datetime, timezone
+
+def iso_from_ns(ns: int) -> str:
+    """Format a time.time_ns() value as an ISO-8601 UTC string.
+
+    Hot paths record integer nanoseconds and call this only where a
+    timestamp leaves the process (exports, lead payloads).
+    """
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
@@ -1,8 +1,12 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
 from prometheus_client import Gauge, Counter
-import statistics
+import numpy as np
 import logging
-from datetime import datetime
+import math
+import time
+from optimization.performance_kernels import partition_rates
+from neonhub.utils.timestamps import iso_from_ns
 
 CONTENT_PERFORMANCE_SCORE = Gauge(
     'content_performance_score',
@@ -20,38 +24,186 @@ LOW_PERFORMERS_ARCHIVED = Counter(
     ['template_id', 'variant_id', 'channel']
 )
 
+# Row layout accepted by ContentFeedbackLoop.record_performance_batch
+PERFORMANCE_DTYPE = np.dtype([("reply", "f8"), ("open", "f8"), ("click", "f8")])
+
+@dataclass
+class _Col:
+    """Column store of performance records for one template (structure of arrays).
+
+    Grows by doubling up to ``maxlen`` rows, then becomes a ring buffer that
+    overwrites the oldest record, so steady-state recording allocates nothing.
+    """
+    template_id: str
+    maxlen: int = 10_000
+    capacity: int = 16
+    size: int = 0
+    start: int = 0  # physical index of the oldest row once the ring has wrapped
+    # Welford running state over reply_rate: count, mean, sum of squared deviations
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    reply_rate: np.ndarray = field(init=False)
+    open_rate: np.ndarray = field(init=False)
+    click_rate: np.ndarray = field(init=False)
+    timestamp_ns: np.ndarray = field(init=False)
+    variant_id: List[str] = field(default_factory=list)
+    channel: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.capacity = min(self.capacity, self.maxlen)
+        self.reply_rate = np.empty(self.capacity, dtype=np.float64)
+        self.open_rate = np.empty(self.capacity, dtype=np.float64)
+        self.click_rate = np.empty(self.capacity, dtype=np.float64)
+        self.timestamp_ns = np.empty(self.capacity, dtype=np.int64)
+
+    def _grow(self):
+        # Amortized doubling; avoids np.append's copy on every record
+        self.capacity = min(self.capacity * 2, self.maxlen)
+        for name in ("reply_rate", "open_rate", "click_rate", "timestamp_ns"):
+            old = getattr(self, name)
+            new = np.empty(self.capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, variant_id: str, channel: str, reply_rate: float, open_rate: float, click_rate: float, timestamp_ns: int):
+        if self.size == self.capacity and self.capacity < self.maxlen:
+            self._grow()
+        if self.size < self.capacity:
+            i = self.size
+            self.variant_id.append(variant_id)
+            self.channel.append(channel)
+            self.size += 1
+        else:
+            # Window full: overwrite the oldest row and drop it from the running stats
+            i = self.start
+            self.start = (self.start + 1) % self.capacity
+            self._discard(float(self.reply_rate[i]))
+            self.variant_id[i] = variant_id
+            self.channel[i] = channel
+        self.reply_rate[i] = reply_rate
+        self.open_rate[i] = open_rate
+        self.click_rate[i] = click_rate
+        self.timestamp_ns[i] = timestamp_ns
+        self.n += 1
+        delta = reply_rate - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (reply_rate - self.mean)
+
+    def extend(self, variant_ids: List[str], channel: str, rates: np.ndarray, timestamp_ns: int):
+        """Append a PERFORMANCE_DTYPE batch with column-wise copies."""
+        k = len(rates)
+        while self.size + k > self.capacity and self.capacity < self.maxlen:
+            self._grow()
+        if self.size + k > self.capacity:
+            # Batch would wrap the ring; let append() handle the overwrites
+            for vid, (r, o, c) in zip(variant_ids, rates.tolist()):
+                self.append(vid, channel, r, o, c, timestamp_ns)
+            return
+        s = slice(self.size, self.size + k)
+        self.reply_rate[s] = rates["reply"]
+        self.open_rate[s] = rates["open"]
+        self.click_rate[s] = rates["click"]
+        self.timestamp_ns[s] = timestamp_ns
+        self.variant_id.extend(variant_ids)
+        self.channel.extend([channel] * k)
+        self.size += k
+        # Merge the batch's moments into the running state (Chan et al.)
+        reply = self.reply_rate[s]
+        mean_b = float(reply.mean())
+        m2_b = float(np.square(reply - mean_b).sum())
+        n = self.n + k
+        delta = mean_b - self.mean
+        self.mean += delta * k / n
+        self.m2 += m2_b + delta * delta * self.n * k / n
+        self.n = n
+
+    def _discard(self, x: float):
+        # Inverse Welford update
+        self.n -= 1
+        if not self.n:
+            self.mean = self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def stddev(self) -> float:
+        # Sample stddev; clamp float drift that can push m2 just below zero
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1)) if self.n > 1 else 0.0
+
+    def in_order(self, idx: np.ndarray) -> np.ndarray:
+        """Sort physical row indices oldest-first."""
+        if not self.start:
+            return idx
+        return idx[np.argsort((idx - self.start) % self.capacity, kind="stable")]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        return {
+            "template_id": self.template_id,
+            "variant_id": self.variant_id[i],
+            "channel": self.channel[i],
+            "reply_rate": float(self.reply_rate[i]),
+            "open_rate": float(self.open_rate[i]),
+            "click_rate": float(self.click_rate[i]),
+            "timestamp_ns": int(self.timestamp_ns[i]),
+            "timestamp": iso_from_ns(int(self.timestamp_ns[i]))
+        }
+
 class ContentFeedbackLoop:
-    def __init__(self):
+    def __init__(self, window_size: int = 10_000):
+        self.window_size = window_size  # most recent records kept per template
         self.logger = logging.getLogger("ContentFeedbackLoop")
-        self.performance_data: Dict[str, List[Dict[str, Any]]] = {}  # template_id -> list of variant stats
+        self.performance_data: Dict[str, _Col] = {}  # template_id -> columnar variant stats
         self.template_metadata: Dict[str, Dict[str, Any]] = {}  # template_id -> variant_id -> metadata
+        self._boosted: Dict[Tuple[str, str], str] = {}  # (template_id, channel) -> boosted variant_id
+        # Cached metric children keyed by (template_id, variant_id, channel)
+        self._score_handles: Dict[Tuple[str, str, str], Any] = {}
+        self._promoted_handles: Dict[Tuple[str, str, str], Any] = {}
+        self._archived_handles: Dict[Tuple[str, str, str], Any] = {}
+
+    @staticmethod
+    def _handle(handles: Dict[Tuple[str, str, str], Any], metric, key: Tuple[str, str, str]):
+        h = handles.get(key)
+        if h is None:
+            h = handles[key] = metric.labels(*key)
+        return h
 
     def record_performance(self, template_id: str, variant_id: str, channel: str, reply_rate: float, open_rate: float, click_rate: float):
         # Store stats for analysis
         key = f"{template_id}:{variant_id}:{channel}"
-        entry = {
-            "template_id": template_id,
-            "variant_id": variant_id,
-            "channel": channel,
-            "reply_rate": reply_rate,
-            "open_rate": open_rate,
-            "click_rate": click_rate,
-            "timestamp": datetime.utcnow()
-        }
-        self.performance_data.setdefault(template_id, []).append(entry)
-        CONTENT_PERFORMANCE_SCORE.labels(template_id=template_id, variant_id=variant_id, channel=channel).set(reply_rate)
+        col = self.performance_data.get(template_id)
+        if col is None:
+            col = self.performance_data[template_id] = _Col(template_id, maxlen=self.window_size)
+        col.append(variant_id, channel, reply_rate, open_rate, click_rate, time.time_ns())
+        self._handle(self._score_handles, CONTENT_PERFORMANCE_SCORE, (template_id, variant_id, channel)).set(reply_rate)
         self.logger.info(f"Recorded performance for {key}: reply_rate={reply_rate}")
 
+    def record_performance_batch(self, template_id: str, channel: str, variant_ids: List[str], rates: np.ndarray):
+        # Bulk variant of record_performance; rates is a PERFORMANCE_DTYPE array aligned with variant_ids
+        if len(variant_ids) != len(rates):
+            raise ValueError("variant_ids and rates must have the same length")
+        if not len(rates):
+            return
+        rates = np.asarray(rates, dtype=PERFORMANCE_DTYPE)
+        col = self.performance_data.get(template_id)
+        if col is None:
+            col = self.performance_data[template_id] = _Col(template_id, maxlen=self.window_size)
+        col.extend(variant_ids, channel, rates, time.time_ns())
+        for vid, reply_rate in zip(variant_ids, rates["reply"].tolist()):
+            self._handle(self._score_handles, CONTENT_PERFORMANCE_SCORE, (template_id, vid, channel)).set(reply_rate)
+        self.logger.info(f"Recorded {len(rates)} performance rows for {template_id}:{channel}")
+
     def analyze_performance(self, template_id: str) -> Dict[str, Any]:
         # Analyze all variants for a template
-        stats = self.performance_data.get(template_id, [])
-        if not stats:
+        col = self.performance_data.get(template_id)
+        if col is None or not col.size:
             return {}
-        reply_rates = [s["reply_rate"] for s in stats]
-        avg = statistics.mean(reply_rates)
-        stddev = statistics.stdev(reply_rates) if len(reply_rates) > 1 else 0
-        high_performers = [s for s in stats if s["reply_rate"] > avg + stddev]
-        low_performers = [s for s in stats if s["reply_rate"] < avg - stddev]
+        # Mean/stddev come from the running Welford state; only the split scans
+        avg, stddev = col.mean, col.stddev()
+        high_idx, low_idx = partition_rates(col.reply_rate[:col.size], avg, stddev)
+        high_performers = [col.row(i) for i in col.in_order(high_idx)]
+        low_performers = [col.row(i) for i in col.in_order(low_idx)]
         for s in high_performers:
             self._mark_boosted(s)
         for s in low_performers:
@@ -70,7 +222,8 @@ class ContentFeedbackLoop:
             "boost_flag": True,
             "archived": False
         }
-        HIGH_PERFORMERS_PROMOTED.labels(template_id=tid, variant_id=vid, channel=ch).inc()
+        self._boosted[(tid, ch)] = vid
+        self._handle(self._promoted_handles, HIGH_PERFORMERS_PROMOTED, (tid, vid, ch)).inc()
         self.logger.info(f"Boosted content: {tid}:{vid}:{ch}")
 
     def _mark_archived(self, stat: Dict[str, Any]):
@@ -80,16 +233,19 @@ class ContentFeedbackLoop:
             "boost_flag": False,
             "archived": True
         }
-        LOW_PERFORMERS_ARCHIVED.labels(template_id=tid, variant_id=vid, channel=ch).inc()
+        if self._boosted.get((tid, ch)) == vid:
+            del self._boosted[(tid, ch)]
+        self._handle(self._archived_handles, LOW_PERFORMERS_ARCHIVED, (tid, vid, ch)).inc()
         self.logger.info(f"Archived content: {tid}:{vid}:{ch}")
 
     def get_best_variant(self, template_id: str, channel: str) -> Optional[str]:
         # Return the variant_id with boost_flag for this template/channel
-        variants = self.template_metadata.get(template_id, {})
-        for vid, meta in variants.items():
-            if meta.get("boost_flag") and not meta.get("archived"):
-                return vid
-        return None
+        vid = self._boosted.get((template_id, channel))
+        if vid is None:
+            return None
+        # A variant boosted on this channel may since have been archived via another one
+        meta = self.template_metadata.get(template_id, {}).get(vid, {})
+        return None if meta.get("archived") else vid
 
     def get_archived_variants(self, template_id: str) -> List[str]:
         variants = self.template_metadata.get(template_id, {})
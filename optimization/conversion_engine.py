@@ -1,9 +1,13 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from array import array
 from prometheus_client import Counter, Gauge
-import random
+import math
 import logging
+import zlib
+import numpy as np
 from datetime import datetime
 from neonhub.config.settings import get_settings
+from optimization.shared_counters import CounterSlab
 
 OFFERS_SENT = Counter(
     'offers_sent_total',
@@ -21,45 +25,205 @@ LIFT_FROM_CRO = Gauge(
     ['experiment']
 )
 
+# offer_type -> (offer_code, CTA variants)
+_OFFER_CATALOG: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "urgency": ("HURRY10", ("Act Now!", "Limited Time!", "Don't Miss Out!")),
+    "reactivation": ("COME_BACK", ("Welcome Back!", "Here's a Special Deal!", "We Miss You!")),
+    "standard": ("WELCOME", ("Shop Now!", "See Offer", "Get Started")),
+}
+
+# (offer_type, cta) -> variant key, e.g. ("standard", "Shop Now!") -> "standard_shop_now!"
+_VARIANT_KEYS: Dict[Tuple[str, str], str] = {
+    (offer_type, cta): f"{offer_type}_{cta.replace(' ', '_').lower()}"
+    for offer_type, (_, ctas) in _OFFER_CATALOG.items()
+    for cta in ctas
+}
+
+# Random draws are pre-generated in batches of this size
+_RNG_BATCH = 4096
+
+# Slots in the per-variant / per-group [views, conversions] counter arrays
+VIEWS, CONVERSIONS = 0, 1
+
+def _counts() -> array:
+    return array('q', [0, 0])
+
+def _as_dict(counts) -> Dict[str, int]:
+    return {"views": int(counts[VIEWS]), "conversions": int(counts[CONVERSIONS])}
+
+# A/B experiments tracked for lift; each has a control and an experiment group
+MAX_EXPERIMENTS = 64
+CONTROL, EXPERIMENT = 0, 1
+
+# Row layout of the cross-worker counter slab: [experiment][group] rows, then every catalog variant
+_GROUP_ROWS = 2 * MAX_EXPERIMENTS
+_VARIANT_ROWS: Dict[str, int] = {variant: _GROUP_ROWS + i for i, variant in enumerate(_VARIANT_KEYS.values())}
+_SLAB_ROWS = _GROUP_ROWS + len(_VARIANT_ROWS)
+
+def _lifts(groups: np.ndarray) -> np.ndarray:
+    """Experiment-minus-control conversion rate per row of an [experiment][group] grid; empty groups rate 0."""
+    views = groups[..., VIEWS]
+    rates = np.divide(groups[..., CONVERSIONS], views, out=np.zeros(views.shape), where=views > 0)
+    return rates[:, EXPERIMENT] - rates[:, CONTROL]
+
+# Wald SPRT per variant: H0 conversion rate THETA0 vs H1 THETA1, error rates ALPHA/BETA
+SPRT_THETA0 = 0.05
+SPRT_THETA1 = 0.10
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.20
+SPRT_UPPER = math.log((1 - SPRT_BETA) / SPRT_ALPHA)  # accept H1 at or above
+SPRT_LOWER = math.log(SPRT_BETA / (1 - SPRT_ALPHA))  # accept H0 at or below
+# Every view is scored as a non-conversion; a conversion then swaps that for a success
+_LLR_VIEW = math.log((1 - SPRT_THETA1) / (1 - SPRT_THETA0))
+_LLR_CONVERSION = math.log(SPRT_THETA1 / SPRT_THETA0) - _LLR_VIEW
+
 class ConversionEngine:
+    """Serves offers and tracks per-variant and A/B group conversions.
+
+    With settings.conversion_stats_dir set, catalog variant and A/B group
+    counters live in a CounterSlab and get_stats() sums them over every live
+    worker. All other statistics are per process: the SPRT llr (so
+    is_decisive() and serve_offer's CTA filtering see only this worker's
+    traffic), the lift and conversion-rate gauges, and counts for variants
+    outside the offer catalog.
+    """
+
+    # Fixed attribute set: slot access on the serve/record hot path, no per-instance __dict__
+    __slots__ = (
+        'logger', 'settings', 'offer_stats', 'control_group', 'experiment_group', 'llr',
+        '_slab', '_groups', '_exp_index', '_offer_counters', '_rate_gauges', '_lift_gauges',
+        '_dispatch_cache', '_params_version', '_offer_timing', '_template_weights', '_log_info',
+        '_rng', '_coin_buf', '_coin_idx', '_uniform_buf', '_uniform_idx'
+    )
+
     def __init__(self):
         self.logger = logging.getLogger("ConversionEngine")
-        self.offer_stats: Dict[str, Dict[str, Any]] = {}  # variant -> stats
-        self.control_group: Dict[str, int] = {"views": 0, "conversions": 0}
-        self.experiment_group: Dict[str, int] = {"views": 0, "conversions": 0}
         self.settings = get_settings()
+        # With conversion_stats_dir set (multi-worker deployments), catalog variant and
+        # group counters live in this process's slab so get_stats can sum all workers
+        self._slab: Optional[CounterSlab] = None
+        if self.settings.conversion_stats_dir:
+            self._slab = CounterSlab(self.settings.conversion_stats_dir, "conversion_stats", _SLAB_ROWS)
+        self.offer_stats: Dict[str, Any] = {}  # variant -> [views, conversions]
+        # experiment -> group -> [views, conversions]
+        if self._slab:
+            self._groups = self._slab.array[:_GROUP_ROWS].reshape(MAX_EXPERIMENTS, 2, 2)
+        else:
+            self._groups = np.zeros((MAX_EXPERIMENTS, 2, 2), dtype=np.int64)
+        self._exp_index: Dict[str, int] = {"offer_ab": 0}
+        self.control_group = self._groups[0, CONTROL]
+        self.experiment_group = self._groups[0, EXPERIMENT]
+        self.llr: Dict[str, float] = {}  # variant -> SPRT log-likelihood ratio
+        # Metric children bound on first sight so the hot path skips labels()
+        self._offer_counters: Dict[str, Any] = {}
+        self._rate_gauges: Dict[str, Any] = {}
+        self._lift_gauges = [LIFT_FROM_CRO.labels(experiment=name) for name in self._exp_index]
+        # (ugc_spike_immediate, status) -> (offer_type, offer_code, CTAs sorted by weight);
+        # valid for one strategy_params version
+        self._dispatch_cache: Dict[Tuple[bool, Optional[str]], Tuple[str, str, List[Tuple[str, float]]]] = {}
+        self.reload()
+        # Batched PRNG: group-assignment coin flips and uniforms for CTA picks
+        self._rng = np.random.default_rng()
+        self._refill_coins()
+        self._refill_uniforms()
 
-    def serve_offer(self, lead_state: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        # Use optimizer's offer timing if available
+    def _offer_counter(self, offer_type: str):
+        counter = self._offer_counters.get(offer_type)
+        if counter is None:
+            counter = self._offer_counters[offer_type] = OFFERS_SENT.labels(type=offer_type)
+        return counter
+
+    def _rate_gauge(self, variant: str):
+        gauge = self._rate_gauges.get(variant)
+        if gauge is None:
+            gauge = self._rate_gauges[variant] = OFFER_CONVERSION_RATE.labels(variant=variant)
+        return gauge
+
+    def _new_counts(self, variant: str):
+        row = _VARIANT_ROWS.get(variant) if self._slab else None
+        # Variants outside the catalog are counted per process only
+        stats = self.offer_stats[variant] = self._slab.row(row) if row is not None else _counts()
+        return stats
+
+    def reload(self):
+        """Re-read state cached from config; call after logging or settings change.
+        
+        Strategy params are also re-read automatically whenever
+        settings.strategy_params_version moves.
+        """
+        self._log_info = self.logger.isEnabledFor(logging.INFO)
         strategy_params = self.settings.strategy_params or {}
-        offer_timing = strategy_params.get('offer_timing', {})
-        if offer_timing.get('ugc_spike') == 'immediate':
+        self._offer_timing = strategy_params.get('offer_timing', {})
+        self._template_weights = strategy_params.get('template_weights', {})
+        self._params_version = self.settings.strategy_params_version
+        self._dispatch_cache.clear()
+
+    def _refill_coins(self):
+        self._coin_buf = self._rng.integers(0, 2, size=_RNG_BATCH, dtype=np.uint8).tolist()
+        self._coin_idx = 0
+
+    def _refill_uniforms(self):
+        self._uniform_buf = self._rng.random(_RNG_BATCH).tolist()
+        self._uniform_idx = 0
+
+    def _coin(self) -> int:
+        coin = self._coin_buf[self._coin_idx]
+        self._coin_idx += 1
+        if self._coin_idx == _RNG_BATCH:
+            self._refill_coins()
+        return coin
+
+    def _pick(self, n: int) -> int:
+        # Uniform index in [0, n)
+        u = self._uniform_buf[self._uniform_idx]
+        self._uniform_idx += 1
+        if self._uniform_idx == _RNG_BATCH:
+            self._refill_uniforms()
+        return int(u * n)
+
+    def _dispatch(self, status: Optional[str]) -> Tuple[str, str, List[Tuple[str, float]]]:
+        if self.settings.strategy_params_version != self._params_version:
+            self.reload()
+        # Use optimizer's offer timing if available
+        ugc_immediate = self._offer_timing.get('ugc_spike') == 'immediate'
+        key = (ugc_immediate, status)
+        dispatch = self._dispatch_cache.get(key)
+        if dispatch is not None:
+            return dispatch
+
+        if ugc_immediate or status == "hesitant":
             # Example: prioritize urgency offer
             offer_type = "urgency"
-            offer_code = "HURRY10"
-            cta_variants = ["Act Now!", "Limited Time!", "Don't Miss Out!"]
-        elif lead_state.get("status") == "hesitant":
-            offer_type = "urgency"
-            offer_code = "HURRY10"
-            cta_variants = ["Act Now!", "Limited Time!", "Don't Miss Out!"]
-        elif lead_state.get("status") == "cold":
+        elif status == "cold":
             offer_type = "reactivation"
-            offer_code = "COME_BACK"
-            cta_variants = ["Welcome Back!", "Here's a Special Deal!", "We Miss You!"]
         else:
             offer_type = "standard"
-            offer_code = "WELCOME"
-            cta_variants = ["Shop Now!", "See Offer", "Get Started"]
+        offer_code, cta_variants = _OFFER_CATALOG[offer_type]
         # Use template_weights to prefer best CTA if available
-        weights = strategy_params.get('template_weights', {})
-        weighted_ctas = [(cta, weights.get(f"{offer_type}_{cta.replace(' ', '_').lower()}", 0)) for cta in cta_variants]
-        weighted_ctas.sort(key=lambda x: x[1], reverse=True)
-        cta = weighted_ctas[0][0] if weighted_ctas and weighted_ctas[0][1] > 0 else random.choice(cta_variants)
-        variant = f"{offer_type}_{cta.replace(' ', '_').lower()}"
-        OFFERS_SENT.labels(type=offer_type).inc()
-        self.logger.info(f"Served offer: {offer_type}, CTA: {cta}, code: {offer_code}")
+        weights = self._template_weights
+        if weights:
+            weighted_ctas = [(cta, weights.get(_VARIANT_KEYS[(offer_type, cta)], 0)) for cta in cta_variants]
+            weighted_ctas.sort(key=lambda x: x[1], reverse=True)
+        else:
+            # Warm start: nothing to rank, every CTA is a uniform pick
+            weighted_ctas = [(cta, 0) for cta in cta_variants]
+        dispatch = self._dispatch_cache[key] = (offer_type, offer_code, weighted_ctas)
+        return dispatch
+
+    def serve_offer(self, lead_state: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        offer_type, offer_code, weighted_ctas = self._dispatch(lead_state.get("status"))
+        # Stop serving CTAs whose SPRT already accepted H0 (keep all if every one lost)
+        live_ctas = [
+            (cta, weight) for cta, weight in weighted_ctas
+            if self.llr.get(_VARIANT_KEYS[(offer_type, cta)], 0.0) > SPRT_LOWER
+        ] or weighted_ctas
+        cta = live_ctas[0][0] if live_ctas[0][1] > 0 else live_ctas[self._pick(len(live_ctas))][0]
+        variant = _VARIANT_KEYS[(offer_type, cta)]
+        self._offer_counter(offer_type).inc()
+        if self._log_info:
+            self.logger.info("Served offer: %s, CTA: %s, code: %s", offer_type, cta, offer_code)
         # Track view for A/B
-        self._record_offer_view(variant)
+        self._record_offer_view(variant, lead_state.get("lead_id") or lead_state.get("id"))
         return {
             "offer_type": offer_type,
             "offer_code": offer_code,
@@ -71,42 +235,74 @@ class ConversionEngine:
         # Track conversion for variant and group
         self._record_offer_conversion(variant)
         if is_experiment:
-            self.experiment_group["conversions"] += 1
+            self.experiment_group[CONVERSIONS] += 1
         else:
-            self.control_group["conversions"] += 1
-        self.logger.info(f"Conversion recorded for variant: {variant}, experiment: {is_experiment}")
+            self.control_group[CONVERSIONS] += 1
+        if self._log_info:
+            self.logger.info("Conversion recorded for variant: %s, experiment: %s", variant, is_experiment)
         self._update_lift()
 
-    def _record_offer_view(self, variant: str):
-        stats = self.offer_stats.setdefault(variant, {"views": 0, "conversions": 0})
-        stats["views"] += 1
-        self._update_conversion_rate(variant)
-        # Randomly assign to control/experiment for test
-        if random.random() < 0.5:
-            self.control_group["views"] += 1
+    def _record_offer_view(self, variant: str, lead_id: Optional[str] = None):
+        stats = self.offer_stats.get(variant)
+        if stats is None:
+            stats = self._new_counts(variant)
+        stats[VIEWS] += 1
+        self.llr[variant] = self.llr.get(variant, 0.0) + _LLR_VIEW
+        # Rate stays 0 until the first conversion; no gauge write needed before then
+        if stats[CONVERSIONS]:
+            self._update_conversion_rate(variant, stats)
+        # Bucket each lead permanently into control/experiment; a stable hash (not the
+        # per-process salted hash()) keeps the split consistent across workers and restarts.
+        # Anonymous views fall back to a coin flip.
+        in_control = not zlib.crc32(lead_id.encode()) & 1 if lead_id else self._coin()
+        if in_control:
+            self.control_group[VIEWS] += 1
         else:
-            self.experiment_group["views"] += 1
+            self.experiment_group[VIEWS] += 1
 
     def _record_offer_conversion(self, variant: str):
-        stats = self.offer_stats.setdefault(variant, {"views": 0, "conversions": 0})
-        stats["conversions"] += 1
-        self._update_conversion_rate(variant)
+        stats = self.offer_stats.get(variant)
+        if stats is None:
+            stats = self._new_counts(variant)
+        stats[CONVERSIONS] += 1
+        self.llr[variant] = self.llr.get(variant, 0.0) + _LLR_CONVERSION
+        self._update_conversion_rate(variant, stats)
 
-    def _update_conversion_rate(self, variant: str):
-        stats = self.offer_stats[variant]
-        rate = stats["conversions"] / stats["views"] if stats["views"] else 0.0
-        OFFER_CONVERSION_RATE.labels(variant=variant).set(rate)
+    def _update_conversion_rate(self, variant: str, stats):
+        rate = stats[CONVERSIONS] / stats[VIEWS] if stats[VIEWS] else 0.0
+        self._rate_gauge(variant).set(rate)
 
     def _update_lift(self):
-        control_rate = self.control_group["conversions"] / self.control_group["views"] if self.control_group["views"] else 0.0
-        exp_rate = self.experiment_group["conversions"] / self.experiment_group["views"] if self.experiment_group["views"] else 0.0
-        lift = exp_rate - control_rate
-        LIFT_FROM_CRO.labels(experiment="offer_ab").set(lift)
-        self.logger.info(f"CRO lift updated: {lift}")
+        lifts = _lifts(self._groups[:len(self._exp_index)]).tolist()
+        for gauge, lift in zip(self._lift_gauges, lifts):
+            gauge.set(lift)
+        if self._log_info:
+            self.logger.info("CRO lift updated: %s", lifts[0])
+
+    def is_decisive(self, variant: str) -> Optional[str]:
+        """SPRT verdict for a variant: "H1" (beats baseline), "H0" (doesn't) or None (keep testing)."""
+        llr = self.llr.get(variant, 0.0)
+        if llr >= SPRT_UPPER:
+            return "H1"
+        if llr <= SPRT_LOWER:
+            return "H0"
+        return None
 
     def get_stats(self) -> Dict[str, Any]:
+        offer_stats = {variant: _as_dict(stats) for variant, stats in self.offer_stats.items()}
+        if self._slab is None:
+            return {
+                "offer_stats": offer_stats,
+                "control_group": _as_dict(self.control_group),
+                "experiment_group": _as_dict(self.experiment_group)
+            }
+        # Aggregate catalog variants and groups across every worker's slab
+        totals = self._slab.total()
+        for variant, row in _VARIANT_ROWS.items():
+            if totals[row].any():
+                offer_stats[variant] = _as_dict(totals[row])
         return {
-            "offer_stats": self.offer_stats,
-            "control_group": self.control_group,
-            "experiment_group": self.experiment_group
-        } 
\ No newline at end of file
+            "offer_stats": offer_stats,
+            "control_group": _as_dict(totals[CONTROL]),
+            "experiment_group": _as_dict(totals[EXPERIMENT])
+        }
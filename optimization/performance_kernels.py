@@ -0,0 +1,34 @@
+from typing import Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _partition_rates_loop(rates: np.ndarray, avg: float, sd: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Explicit loop: compiled by Numba into a single pass over the column
+    hi = avg + sd
+    lo = avg - sd
+    high = np.empty(rates.size, dtype=np.int64)
+    low = np.empty(rates.size, dtype=np.int64)
+    nh = 0
+    nl = 0
+    for i in range(rates.size):
+        r = rates[i]
+        if r > hi:
+            high[nh] = i
+            nh += 1
+        elif r < lo:
+            low[nl] = i
+            nl += 1
+    return high[:nh], low[:nl]
+
+def _partition_rates_numpy(rates: np.ndarray, avg: float, sd: float) -> Tuple[np.ndarray, np.ndarray]:
+    return np.flatnonzero(rates > avg + sd), np.flatnonzero(rates < avg - sd)
+
+# Indices of rates above/below one stddev of a (precomputed) mean
+if njit is not None:
+    partition_rates = njit(cache=True)(_partition_rates_loop)
+else:
+    partition_rates = _partition_rates_numpy
@@ -0,0 +1,88 @@
+import atexit
+import fcntl
+import glob
+import mmap
+import os
+import numpy as np
+
+class CounterSlab:
+    """Grid of int64 counters in an mmap'd file, one file per worker process.
+
+    Each process only writes its own slab, so increments need no cross-process
+    lock; readers sum every live slab in the directory (the same scheme as
+    prometheus_client's multiprocess mode). A worker holds a shared flock on
+    its slab for its whole life; slabs nobody holds belong to exited workers
+    and are swept, so totals cover the current workers only and a recycled
+    PID never reopens an old slab.
+    """
+
+    def __init__(self, directory: str, name: str, rows: int, cols: int = 2):
+        self.directory = directory
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        os.makedirs(directory, exist_ok=True)
+        self._sweep()
+        # Per-process generation token keeps slab files unique across PID reuse
+        stem = f"{name}_{os.getpid()}_{os.urandom(4).hex()}"
+        self.path = os.path.join(directory, f"{stem}.bin")
+        self._closed = False
+        size = 8 * rows * cols
+        tmp_path = os.path.join(directory, f"{stem}.tmp")
+        self._fh = open(tmp_path, "w+b")
+        self._fh.truncate(size)  # zero-filled
+        # Lock before the file becomes visible under its final name, so a sweep never takes it
+        fcntl.flock(self._fh.fileno(), fcntl.LOCK_SH)
+        os.replace(tmp_path, self.path)
+        self._mm = mmap.mmap(self._fh.fileno(), size)
+        self.values = memoryview(self._mm).cast("q")
+        # NumPy view over the same memory, for vectorized reads and writes
+        self.array = np.ndarray((rows, cols), dtype=np.int64, buffer=self._mm)
+        atexit.register(self.close)
+
+    def _slab_paths(self):
+        return glob.glob(os.path.join(self.directory, f"{self.name}_*.bin"))
+
+    def _sweep(self) -> None:
+        """Delete slabs whose owning process has exited (no flock held on them)."""
+        for path in self._slab_paths():
+            try:
+                with open(path, "rb") as f:
+                    try:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # owner still running
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def row(self, i: int) -> memoryview:
+        """Writable view of one row; ``row[j] += 1`` updates the slab in place."""
+        return self.values[i * self.cols:(i + 1) * self.cols]
+
+    def total(self) -> np.ndarray:
+        """Sum of this counter grid over every live worker's slab."""
+        self._sweep()
+        total = np.zeros((self.rows, self.cols), dtype=np.int64)
+        for path in self._slab_paths():
+            try:
+                data = np.fromfile(path, dtype=np.int64)
+            except FileNotFoundError:
+                continue
+            if data.size == self.rows * self.cols:
+                total += data.reshape(self.rows, self.cols)
+        return total
+
+    def close(self) -> None:
+        """Remove this process's slab file; called automatically at interpreter exit.
+
+        The mapping itself stays valid (callers may still hold row views) and
+        is released, along with the flock, when the process exits.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
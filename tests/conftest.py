@@ -1,6 +1,83 @@
+import asyncio
+import httpx
 import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
 from dotenv import load_dotenv
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 
 @pytest.fixture(scope="session", autouse=True)
 def load_env():
-    load_dotenv() 
\ No newline at end of file
+    load_dotenv()
+
+@pytest.fixture(scope="session", autouse=True)
+def settings_cache():
+    # get_settings() is cached for the whole run; drop it once at the end
+    from neonhub.config.settings import get_settings
+    yield
+    get_settings.cache_clear()
+
+@pytest.fixture(scope="session")
+def event_loop():
+    # One loop for the whole run so session-scoped async fixtures can share it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def client():
+    from dashboard_server import app
+    return TestClient(app)
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client():
+    """In-process ASGI client; avoids TestClient's per-request portal thread."""
+    from dashboard_server import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as c:
+        yield c
+
+def _collect_metrics():
+    """Every registered sample in one pass: (sample name, sorted labels) -> value."""
+    return {
+        (s.name, tuple(sorted(s.labels.items()))): s.value
+        for m in REGISTRY.collect()
+        for s in m.samples
+    }
+
+@pytest.fixture
+def metric_snapshot():
+    return _collect_metrics
+
+@pytest.fixture
+def mock_post(monkeypatch):
+    """requests.post replaced by a Mock answering 200; set .content or .side_effect per test."""
+    m = Mock()
+    m.return_value.status_code = 200
+    monkeypatch.setattr("requests.post", m)
+    return m
+
+class StubMessenger:
+    """Records sends instead of delivering them."""
+    
+    def __init__(self):
+        self.calls = []
+        
+    def send_whatsapp(self, *args, **kwargs):
+        self.calls.append(("wa", args, kwargs))
+        return SimpleNamespace(status="sent")
+        
+    def send_sms(self, *args, **kwargs):
+        self.calls.append(("sms", args, kwargs))
+        return SimpleNamespace(status="sent")
+        
+    def sent(self, channel):
+        return any(c[0] == channel for c in self.calls)
+        
+    def reset(self):
+        self.calls.clear()
+
+@pytest.fixture
+def stub_messenger():
+    return StubMessenger()
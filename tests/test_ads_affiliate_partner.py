@@ -2,7 +2,6 @@ import pytest
 from integration.ads_feedback import AdsFeedback
 from integration.affiliate_tracker import AffiliateTracker
 from integration.partner_outreach_agent import PartnerOutreachAgent
-import asyncio
 
 # AdsFeedback tests
 def test_ads_feedback_top_themes():
@@ -21,13 +20,12 @@ def test_affiliate_tracker_log_and_score():
     assert tracker.get_affiliate_score("aff123") == 2
 
 # PartnerOutreachAgent tests
-@pytest.mark.asyncio
-def test_partner_outreach_agent(monkeypatch):
+async def test_partner_outreach_agent(monkeypatch):
     agent = PartnerOutreachAgent()
     partner = {"name": "Acme Inc", "email": "acme@example.com", "region": "US"}
     def mock_send_email(to, subject, body):
         assert "partner program" in body
         return True
     monkeypatch.setattr(agent.messenger, "send_email", mock_send_email)
-    result = asyncio.run(agent.contact_partner(partner, channel="email"))
+    result = await agent.contact_partner(partner, channel="email")
     assert result is None or result is True 
\ No newline at end of file
@@ -1,3 +1,4 @@
+import copy
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
@@ -5,53 +6,65 @@ from datetime import datetime
 from neonhub.services.content_personalizer import ContentPersonalizer
 from neonhub.utils.localization import LocalizationService
 
+_SAMPLE_LEAD_DATA = {
+    "id": "lead_123",
+    "first_name": "John",
+    "company_name": "Test Corp",
+    "industry": "Retail",
+    "persona": "Retail Buyer",
+    "preferred_language": "en",
+    "segment_score": 0.8
+}
+
+_SAMPLE_TEMPLATE = {
+    "template_id": "demo_outreach_email",
+    "name": "Initial Outreach Email",
+    "languages": ["en", "es"],
+    "variants": [
+        {
+            "id": "variant_1",
+            "language": "en",
+            "segment_score": 0.7,
+            "use_ai_personalization": True,
+            "content": {
+                "subject": "Transform Your Business with {{company_name}}'s Neon Signs",
+                "body": "Dear {{first_name}},\n\nI noticed {{company_name}}'s work in {{industry}}."
+            }
+        },
+        {
+            "id": "variant_2",
+            "language": "es",
+            "segment_score": 0.7,
+            "use_ai_personalization": True,
+            "content": {
+                "subject": "Transforma tu Negocio con Letreros de Neón de {{company_name}}",
+                "body": "Estimado/a {{first_name}},\n\nHe notado el trabajo de {{company_name}} en {{industry}}."
+            }
+        }
+    ]
+}
+
+_MOBILE_PERSONALIZATION = {
+    "first_name": "Alex",
+    "product": "Neon Sign",
+    "offer_code": "SAVE20",
+    "short_url": "bit.ly/neon"
+}
+
 @pytest.fixture
 def content_personalizer():
     return ContentPersonalizer()
 
 @pytest.fixture
 def sample_lead_data():
-    return {
-        "id": "lead_123",
-        "first_name": "John",
-        "company_name": "Test Corp",
-        "industry": "Retail",
-        "persona": "Retail Buyer",
-        "preferred_language": "en",
-        "segment_score": 0.8
-    }
+    # Shallow copy: tests may overwrite top-level keys such as preferred_language
+    return dict(_SAMPLE_LEAD_DATA)
 
 @pytest.fixture
 def sample_template():
-    return {
-        "template_id": "demo_outreach_email",
-        "name": "Initial Outreach Email",
-        "languages": ["en", "es"],
-        "variants": [
-            {
-                "id": "variant_1",
-                "language": "en",
-                "segment_score": 0.7,
-                "use_ai_personalization": True,
-                "content": {
-                    "subject": "Transform Your Business with {{company_name}}'s Neon Signs",
-                    "body": "Dear {{first_name}},\n\nI noticed {{company_name}}'s work in {{industry}}."
-                }
-            },
-            {
-                "id": "variant_2",
-                "language": "es",
-                "segment_score": 0.7,
-                "use_ai_personalization": True,
-                "content": {
-                    "subject": "Transforma tu Negocio con Letreros de Neón de {{company_name}}",
-                    "body": "Estimado/a {{first_name}},\n\nHe notado el trabajo de {{company_name}} en {{industry}}."
-                }
-            }
-        ]
-    }
+    # generate_content can rewrite variant dicts in place
+    return copy.deepcopy(_SAMPLE_TEMPLATE)
 
-@pytest.mark.asyncio
 async def test_generate_content_basic(content_personalizer, sample_lead_data, sample_template):
     """Test basic content generation without AI personalization."""
     with patch.object(content_personalizer, 'templates', {'demo_outreach_email': sample_template}):
@@ -68,7 +81,6 @@ async def test_generate_content_basic(content_personalizer, sample_lead_data, sa
         assert result["metadata"]["template_id"] == "demo_outreach_email"
         assert result["metadata"]["language"] == "en"
         
-@pytest.mark.asyncio
 async def test_generate_content_with_translation(content_personalizer, sample_lead_data, sample_template):
     """Test content generation with translation."""
     sample_lead_data["preferred_language"] = "es"
@@ -90,7 +102,6 @@ async def test_generate_content_with_translation(content_personalizer, sample_le
             assert result["content"]["body"] == "Translated Body"
             assert result["metadata"]["language"] == "es"
             
-@pytest.mark.asyncio
 async def test_generate_content_with_ai_personalization(content_personalizer, sample_lead_data, sample_template):
     """Test content generation with AI personalization."""
     with patch.object(content_personalizer, 'templates', {'demo_outreach_email': sample_template}):
@@ -108,7 +119,6 @@ async def test_generate_content_with_ai_personalization(content_personalizer, sa
             assert result["content"]["subject"] == "AI Personalized Subject"
             assert result["content"]["body"] == "AI Personalized Body"
             
-@pytest.mark.asyncio
 async def test_generate_content_fallback(content_personalizer, sample_lead_data):
     """Test content generation fallback when template not found."""
     result = await content_personalizer.generate_content(
@@ -120,7 +130,6 @@ async def test_generate_content_fallback(content_personalizer, sample_lead_data)
     assert result["metadata"]["is_fallback"] is True
     assert result["metadata"]["language"] == "en"
     
-@pytest.mark.asyncio
 async def test_variant_selection(content_personalizer, sample_lead_data, sample_template):
     """Test variant selection based on strategy."""
     with patch.object(content_personalizer, 'templates', {'demo_outreach_email': sample_template}):
@@ -140,7 +149,6 @@ async def test_variant_selection(content_personalizer, sample_lead_data, sample_
         )
         assert result_score["metadata"]["variant_id"] == "variant_1"
         
-@pytest.mark.asyncio
 async def test_metrics_tracking(content_personalizer, sample_lead_data, sample_template):
     """Test metrics tracking for content generation."""
     with patch.object(content_personalizer, 'templates', {'demo_outreach_email': sample_template}):
@@ -154,7 +162,6 @@ async def test_metrics_tracking(content_personalizer, sample_lead_data, sample_t
         assert content_personalizer.metrics.get("total_leads") is not None
         assert content_personalizer.metrics.get("variants_used") is not None
         
-@pytest.mark.asyncio
 async def test_error_handling(content_personalizer, sample_lead_data):
     """Test error handling in content generation."""
     # Test with invalid template
@@ -188,12 +195,7 @@ def personalizer():
 def test_mobile_personalization_basic(personalizer, channel, template_id):
     content = personalizer.generate_content(
         template_id=template_id,
-        personalization={
-            "first_name": "Alex",
-            "product": "Neon Sign",
-            "offer_code": "SAVE20",
-            "short_url": "bit.ly/neon"
-        },
+        personalization=_MOBILE_PERSONALIZATION,
         channel=channel,
         lang="en",
         persona="Retail Buyer"
@@ -213,12 +215,7 @@ def test_mobile_overflow_truncation(personalizer, channel, template_id):
     long_product = "Super Bright Neon Sign with Customizable Colors and Extra Long Description to Force Truncation " * 3
     content = personalizer.generate_content(
         template_id=template_id,
-        personalization={
-            "first_name": "Alex",
-            "product": long_product,
-            "offer_code": "SAVE20",
-            "short_url": "bit.ly/neon"
-        },
+        personalization={**_MOBILE_PERSONALIZATION, "product": long_product},
         channel=channel,
         lang="en",
         persona="Retail Buyer"
@@ -233,12 +230,7 @@ def test_mobile_overflow_truncation(personalizer, channel, template_id):
 def test_mobile_fallback(personalizer, channel, template_id, lang, persona):
     content = personalizer.generate_content(
         template_id=template_id,
-        personalization={
-            "first_name": "Alex",
-            "product": "Neon Sign",
-            "offer_code": "SAVE20",
-            "short_url": "bit.ly/neon"
-        },
+        personalization=_MOBILE_PERSONALIZATION,
         channel=channel,
         lang=lang,
         persona=persona
@@ -253,12 +245,7 @@ def test_mobile_fallback(personalizer, channel, template_id, lang, persona):
 def test_mobile_emoji_and_tone(personalizer, channel, template_id, lang, persona, expected_tone):
     content = personalizer.generate_content(
         template_id=template_id,
-        personalization={
-            "first_name": "Alex",
-            "product": "Neon Sign",
-            "offer_code": "SAVE20",
-            "short_url": "bit.ly/neon"
-        },
+        personalization=_MOBILE_PERSONALIZATION,
         channel=channel,
         lang=lang,
         persona=persona
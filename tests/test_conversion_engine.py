@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from neonhub.config.settings import get_settings
+from prometheus_client import REGISTRY
+from optimization.conversion_engine import (
+    ConversionEngine, CONTROL, CONVERSIONS, EXPERIMENT, MAX_EXPERIMENTS, SPRT_LOWER, VIEWS, _SLAB_ROWS, _lifts
+)
+
+# "standard" offer CTAs and their variant keys
+SHOP_NOW, SEE_OFFER, GET_STARTED = "standard_shop_now!", "standard_see_offer", "standard_get_started"
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Shared settings with strategy params and stats dir reset; restored after each test."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "strategy_params", {})
+    monkeypatch.setattr(settings, "strategy_params_version", settings.strategy_params_version + 1)
+    monkeypatch.setattr(settings, "conversion_stats_dir", None)
+    return settings
+
+@pytest.fixture
+def engine(settings):
+    settings.update_strategy_params({"template_weights": {SHOP_NOW: 1.0, SEE_OFFER: 0.5}})
+    return ConversionEngine()
+
+def serve(engine, n, start=0):
+    return [engine.serve_offer({"lead_id": f"lead_{i}"}, {})["variant"] for i in range(start, start + n)]
+
+def test_sprt_accepts_h1(engine):
+    # Each view-plus-conversion adds log(THETA1 / THETA0) = log 2; log 16 is the upper bound
+    for i in range(5):
+        serve(engine, 1, start=i)
+        engine.record_conversion(SHOP_NOW, is_experiment=True)
+        if i == 2:
+            assert engine.is_decisive(SHOP_NOW) is None
+
+    assert engine.is_decisive(SHOP_NOW) == "H1"
+
+def test_sprt_accepts_h0(engine):
+    assert serve(engine, 28) == [SHOP_NOW] * 28
+    assert engine.is_decisive(SHOP_NOW) is None
+
+    serve(engine, 1, start=28)
+
+    assert engine.is_decisive(SHOP_NOW) == "H0"
+
+def test_serve_offer_skips_lost_ctas(engine):
+    serve(engine, 29)
+    assert engine.is_decisive(SHOP_NOW) == "H0"
+
+    assert serve(engine, 3, start=29) == [SEE_OFFER] * 3
+
+def test_serve_offer_falls_back_when_every_cta_lost(engine):
+    for variant in (SHOP_NOW, SEE_OFFER, GET_STARTED):
+        engine.llr[variant] = SPRT_LOWER - 1
+
+    # All CTAs lost, so the weighted order applies again rather than serving nothing
+    assert serve(engine, 3) == [SHOP_NOW] * 3
+
+def test_dispatch_cache_follows_strategy_version(engine, settings):
+    assert serve(engine, 2) == [SHOP_NOW] * 2
+
+    settings.update_strategy_params({"template_weights": {GET_STARTED: 1.0}})
+
+    # The version bump drops the cached CTA order on the next serve
+    assert serve(engine, 2, start=2) == [GET_STARTED] * 2
+
+def test_dispatch_cache_follows_offer_timing(engine, settings):
+    assert engine.serve_offer({"lead_id": "lead_0"}, {})["offer_type"] == "standard"
+
+    settings.update_strategy_params({"offer_timing": {"ugc_spike": "immediate"}})
+
+    assert engine.serve_offer({"lead_id": "lead_1"}, {})["offer_type"] == "urgency"
+
+def test_stats_summed_across_worker_slabs(settings, tmp_path):
+    settings.update_strategy_params({"template_weights": {SHOP_NOW: 1.0}})
+    settings.conversion_stats_dir = str(tmp_path)
+    worker_a, worker_b = ConversionEngine(), ConversionEngine()
+    # Slab left behind by a worker that exited without cleaning up: nobody holds its lock
+    stale = tmp_path / "conversion_stats_1_dead.bin"
+    np.ones((_SLAB_ROWS, 2), dtype=np.int64).tofile(stale)
+
+    serve(worker_a, 3)
+    serve(worker_b, 2, start=3)
+    worker_b.record_conversion(SHOP_NOW, is_experiment=False)
+    worker_a.record_conversion("custom_cta", is_experiment=True)
+
+    stats = worker_a.get_stats()
+    assert not stale.exists()
+    assert stats["offer_stats"][SHOP_NOW] == {"views": 5, "conversions": 1}
+    assert stats["control_group"]["views"] + stats["experiment_group"]["views"] == 5
+    assert stats["control_group"]["conversions"] == 1
+    assert stats["experiment_group"]["conversions"] == 1
+    # Variants outside the catalog stay in the recording process
+    assert stats["offer_stats"]["custom_cta"] == {"views": 0, "conversions": 1}
+    assert "custom_cta" not in worker_b.get_stats()["offer_stats"]
+    # The SPRT state is per process too
+    assert worker_a.llr[SHOP_NOW] != worker_b.llr[SHOP_NOW]
+
+def test_vectorized_lift_matches_scalar():
+    rng = np.random.default_rng(7)
+    groups = np.zeros((MAX_EXPERIMENTS, 2, 2), dtype=np.int64)
+    groups[..., VIEWS] = rng.integers(0, 50, size=(MAX_EXPERIMENTS, 2))
+    groups[..., CONVERSIONS] = rng.integers(0, 10, size=(MAX_EXPERIMENTS, 2)) * (groups[..., VIEWS] > 0)
+    groups[0] = 0  # nothing seen yet
+    groups[1, CONTROL] = 0  # only the experiment group has views
+    groups[1, EXPERIMENT] = (20, 5)
+
+    def scalar(control, experiment):
+        control_rate = control[CONVERSIONS] / control[VIEWS] if control[VIEWS] else 0.0
+        exp_rate = experiment[CONVERSIONS] / experiment[VIEWS] if experiment[VIEWS] else 0.0
+        return exp_rate - control_rate
+
+    expected = [scalar(g[CONTROL], g[EXPERIMENT]) for g in groups]
+    assert _lifts(groups).tolist() == pytest.approx(expected)
+    assert _lifts(groups)[:2].tolist() == [0.0, 0.25]
+
+def lift_gauge():
+    return REGISTRY.get_sample_value("lift_from_cro_total", {"experiment": "offer_ab"})
+
+def test_lift_gauge_with_empty_group(engine):
+    # Conversion before any view: both groups still rate 0
+    engine.record_conversion(SHOP_NOW, is_experiment=True)
+    assert lift_gauge() == 0.0
+
+    serve(engine, 40)
+    engine.record_conversion(SHOP_NOW, is_experiment=False)
+    stats = engine.get_stats()
+    control, experiment = stats["control_group"], stats["experiment_group"]
+    expected = experiment["conversions"] / experiment["views"] - control["conversions"] / control["views"]
+    assert lift_gauge() == pytest.approx(expected)
+
+def test_lead_bucketing_is_stable_and_balanced(engine, settings):
+    other = ConversionEngine()
+    for _ in range(5):
+        engine.serve_offer({"lead_id": "lead_sticky"}, {})
+        other.serve_offer({"id": "lead_sticky"}, {})
+    # Every view of one lead lands in the same group, in any engine (and any worker)
+    assert {int(engine.control_group[VIEWS]), int(engine.experiment_group[VIEWS])} == {0, 5}
+    assert engine.control_group[VIEWS] == other.control_group[VIEWS]
+
+    fresh = ConversionEngine()
+    serve(fresh, 2000)
+    assert 900 <= fresh.control_group[VIEWS] <= 1100
+    assert fresh.control_group[VIEWS] + fresh.experiment_group[VIEWS] == 2000
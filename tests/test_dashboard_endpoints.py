@@ -1,50 +1,46 @@
 import pytest
-from fastapi.testclient import TestClient
-from dashboard_server import app
 
-client = TestClient(app)
-
-def test_get_agent_status():
+def test_get_agent_status(client):
     response = client.get("/status/agents")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
 
-def test_get_high_error_agents():
+def test_get_high_error_agents(client):
     response = client.get("/status/agents/high-error?threshold=1")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
 
-def test_get_email_metrics():
+def test_get_email_metrics(client):
     response = client.get("/metrics/email")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
 
-def test_get_linkedin_metrics():
+def test_get_linkedin_metrics(client):
     response = client.get("/metrics/linkedin")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
 
-def test_get_content_metrics():
+def test_get_content_metrics(client):
     response = client.get("/metrics/content")
     assert response.status_code == 200
     assert isinstance(response.json(), dict)
 
-def test_get_logs():
+def test_get_logs(client):
     response = client.get("/logs?limit=5")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
-def test_get_lead_sequence_not_found():
+def test_get_lead_sequence_not_found(client):
     response = client.get("/sequences/nonexistent_lead")
     assert response.status_code == 404
     assert response.json()["detail"] == "Lead not found"
 
-def test_get_top_templates():
+def test_get_top_templates(client):
     response = client.get("/insights/top-performing-templates")
     assert response.status_code == 200
     assert "top_templates" in response.json()
 
-def test_export_leads_csv():
+def test_export_leads_csv(client):
     response = client.get("/export/leads.csv")
     assert response.status_code == 200
     assert response.headers["content-type"].startswith("text/csv")
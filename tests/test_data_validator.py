@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+from neonhub.utils.data_validator import LeadValidator
+
+async def test_validate_stamps_iso_validated_at():
+    lead = {
+        "company_name": "Test Corp",
+        "location": {"city": "Austin", "country": "US"},
+        "contact_info": {"email": "jane@testcorp.com"},
+        "source": "linkedin"
+    }
+
+    assert await LeadValidator().validate(lead)
+
+    # Consumers read validated_at as an ISO-8601 string
+    validated_at = datetime.fromisoformat(lead["validated_at"])
+    assert validated_at.tzinfo == timezone.utc
+    assert abs((datetime.now(timezone.utc) - validated_at).total_seconds()) < 60
+    assert lead["data_source"] == "linkedin"
@@ -0,0 +1,23 @@
+from neonhub.utils.email_templates import EmailTemplate
+
+async def test_defaults_seeded_into_empty_dir(tmp_path):
+    templates_dir = tmp_path / "email"
+    email_templates = EmailTemplate(templates_dir=str(templates_dir))
+
+    await email_templates.load_templates()
+
+    assert (templates_dir / "initial_outreach.json").exists()
+    assert (templates_dir / "follow_up.json").exists()
+    assert set(email_templates.templates) == {"initial_outreach", "follow_up"}
+    subject, _ = email_templates.render("follow_up", contact_name="Sam")
+    assert subject == "Following up - NeonHub Distribution Opportunity"
+
+async def test_existing_templates_not_reseeded(tmp_path):
+    email_templates = EmailTemplate(templates_dir=str(tmp_path))
+    email_templates.create_template("custom", "Hi {{name}}", "<p>{{name}}</p>", ["name"])
+
+    reloaded = EmailTemplate(templates_dir=str(tmp_path))
+    await reloaded.load_templates()
+
+    assert set(reloaded.templates) == {"custom"}
+    assert reloaded.render("custom", name="Ana") == ("Hi Ana", "<p>Ana</p>")
@@ -1,10 +1,11 @@
+import asyncio
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
 import json
 from pathlib import Path
 
-from neonhub.services.engagement_tracker import EngagementTracker
+from neonhub.services.engagement_tracker import EngagementTracker, WRITE_COALESCE_SECONDS
 from neonhub.schemas.lead_state import LeadState, LeadStatus, SequenceStage
 
 @pytest.fixture
@@ -25,7 +26,6 @@ def sample_lead_state():
         ]
     )
 
-@pytest.mark.asyncio
 async def test_track_event(engagement_tracker, sample_lead_state):
     """Test tracking an engagement event."""
     # Save initial state
@@ -46,7 +46,6 @@ async def test_track_event(engagement_tracker, sample_lead_state):
     assert len(updated_state.engagement_history) == 1
     assert updated_state.engagement_history[0].event_type == "email_open"
     
-@pytest.mark.asyncio
 async def test_multiple_events(engagement_tracker, sample_lead_state):
     """Test tracking multiple engagement events."""
     # Save initial state
@@ -73,7 +72,6 @@ async def test_multiple_events(engagement_tracker, sample_lead_state):
     assert updated_state.engagement_score == 9  # 1 + 3 + 5
     assert len(updated_state.engagement_history) == 3
     
-@pytest.mark.asyncio
 async def test_negative_events(engagement_tracker, sample_lead_state):
     """Test tracking negative engagement events."""
     # Save initial state
@@ -99,7 +97,6 @@ async def test_negative_events(engagement_tracker, sample_lead_state):
     assert updated_state.engagement_score == -9  # 1 - 10
     assert len(updated_state.engagement_history) == 2
     
-@pytest.mark.asyncio
 async def test_should_pause_lead(engagement_tracker, sample_lead_state):
     """Test lead pausing based on engagement score."""
     # Save initial state
@@ -120,7 +117,6 @@ async def test_should_pause_lead(engagement_tracker, sample_lead_state):
     
     assert should_pause is True
     
-@pytest.mark.asyncio
 async def test_get_engagement_history(engagement_tracker, sample_lead_state):
     """Test retrieving engagement history."""
     # Save initial state
@@ -141,7 +137,6 @@ async def test_get_engagement_history(engagement_tracker, sample_lead_state):
     assert len(history) == 3
     assert [event["event_type"] for event in history] == events
     
-@pytest.mark.asyncio
 async def test_reset_lead_score(engagement_tracker, sample_lead_state):
     """Test resetting a lead's engagement score."""
     # Save initial state
@@ -164,7 +159,6 @@ async def test_reset_lead_score(engagement_tracker, sample_lead_state):
     assert updated_state.engagement_score == 0
     assert len(updated_state.engagement_history) == 0
     
-@pytest.mark.asyncio
 async def test_invalid_lead(engagement_tracker):
     """Test handling of invalid lead IDs."""
     # Try to track event for non-existent lead
@@ -182,7 +176,6 @@ async def test_invalid_lead(engagement_tracker):
     history = await engagement_tracker.get_engagement_history("non_existent_lead")
     assert history == []
     
-@pytest.mark.asyncio
 async def test_metrics_tracking(engagement_tracker, sample_lead_state):
     """Test that metrics are properly updated."""
     # Save initial state
@@ -202,4 +195,65 @@ async def test_metrics_tracking(engagement_tracker, sample_lead_state):
     assert updated_state.engagement_score == 1
     
     # Check that metrics were updated
-    assert engagement_tracker.ENGAGEMENT_EVENTS._value.get(("email_open",)) == 1 
\ No newline at end of file
+    assert engagement_tracker.ENGAGEMENT_EVENTS._value.get(("email_open",)) == 1
+
+
+async def test_burst_events_coalesce_into_one_write(engagement_tracker, sample_lead_state):
+    """Test that events landing within one tick are persisted with a single write."""
+    engagement_tracker.save_lead_state(sample_lead_state)
+    state_path = engagement_tracker.states_dir / f"{sample_lead_state.lead_id}.json"
+    
+    with patch.object(engagement_tracker, "save_lead_state", wraps=engagement_tracker.save_lead_state) as save:
+        for _ in range(3):
+            await engagement_tracker.track_event(sample_lead_state.lead_id, "email_open", {})
+        await engagement_tracker.flush()
+        
+    assert save.call_count == 1
+    on_disk = LeadState.model_validate_json(state_path.read_bytes())
+    assert len(on_disk.engagement_history) == 3
+    assert on_disk.engagement_score == 3
+
+
+async def test_score_sees_writes_from_other_tracker(sample_lead_state):
+    """Test that a cached score is revalidated against the state file."""
+    reader, writer = EngagementTracker(), EngagementTracker()
+    writer.save_lead_state(sample_lead_state)
+    assert await reader.get_lead_score(sample_lead_state.lead_id) == 0
+    
+    writer.save_lead_state(sample_lead_state.model_copy(update={"engagement_score": 7}))
+    
+    assert await reader.get_lead_score(sample_lead_state.lead_id) == 7
+
+
+async def test_pending_state_returned_as_copy(engagement_tracker, sample_lead_state):
+    """Test that mutating a returned state doesn't change the unflushed one."""
+    engagement_tracker.save_lead_state(sample_lead_state)
+    await engagement_tracker.track_event(sample_lead_state.lead_id, "email_open", {})
+    
+    state = engagement_tracker.get_lead_state(sample_lead_state.lead_id)
+    state.engagement_score = 100
+    state.engagement_history.clear()
+    await engagement_tracker.flush()
+    
+    on_disk = engagement_tracker.get_lead_state(sample_lead_state.lead_id)
+    assert on_disk.engagement_score == 1
+    assert len(on_disk.engagement_history) == 1
+
+
+def test_flush_rescheduled_after_loop_closes(sample_lead_state):
+    """Test that a flush cancelled along with its event loop doesn't block later flushes."""
+    tracker = EngagementTracker()
+    tracker.save_lead_state(sample_lead_state)
+    lead_id = sample_lead_state.lead_id
+    
+    # asyncio.run cancels the pending flush when it closes the loop
+    asyncio.run(tracker.track_event(lead_id, "email_open", {}))
+    
+    async def track_and_wait():
+        await tracker.track_event(lead_id, "email_click", {})
+        await asyncio.sleep(WRITE_COALESCE_SECONDS + 0.1)
+        
+    asyncio.run(track_and_wait())
+    
+    on_disk = LeadState.model_validate_json((tracker.states_dir / f"{lead_id}.json").read_bytes())
+    assert [e.event_type for e in on_disk.engagement_history] == ["email_open", "email_click"]
@@ -1,20 +1,16 @@
 import pytest
-from fastapi.testclient import TestClient
-from dashboard_server import app
 
-client = TestClient(app)
-
-def test_health():
+def test_health(client):
     resp = client.get("/health")
     assert resp.status_code == 200
     assert resp.json()["status"] == "ok"
 
-def test_uptime():
+def test_uptime(client):
     resp = client.get("/uptime")
     assert resp.status_code == 200
     assert "uptime_seconds" in resp.json()
 
-def test_metrics_full():
+def test_metrics_full(client):
     resp = client.get("/metrics/full")
     assert resp.status_code == 200
     data = resp.json()
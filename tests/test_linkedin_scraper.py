@@ -1,136 +1,112 @@
+import orjson
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime
+from pathlib import Path
 
 from neonhub.services.linkedin_scraper import LinkedInScraper
 from neonhub.schemas.linkedin_lead import LinkedInProfile
 
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "linkedin"
+
+class FakeSerp:
+    """Search client serving recorded payloads by engine."""
+    
+    ENGINES = {
+        "linkedin_profiles": "search",
+        "linkedin_company": "company",
+        "linkedin_employees": "employees"
+    }
+    
+    def __init__(self, fixtures, error=None):
+        self.fixtures = fixtures
+        self.error = error
+        self.calls = 0
+        self.params = []
+        
+    def __call__(self, params):
+        self.calls += 1
+        self.params.append(params)
+        if self.error:
+            raise self.error
+        return self.fixtures[self.ENGINES[params["engine"]]]
+
+@pytest.fixture(scope="session")
+def linkedin_fixtures():
+    return {p.stem: orjson.loads(p.read_bytes()) for p in FIXTURES_DIR.glob("*.json")}
+
 @pytest.fixture
-def linkedin_scraper():
-    return LinkedInScraper()
+def linkedin_scraper(linkedin_fixtures):
+    return LinkedInScraper(search_client=FakeSerp(linkedin_fixtures))
+
+# Validated once; tests get deep copies
+_PROFILE_TEMPLATE = LinkedInProfile(
+    profile_id="profile_123",
+    name="John Doe",
+    title="Software Engineer",
+    company="Tech Corp",
+    profile_url="https://linkedin.com/in/johndoe"
+)
 
 @pytest.fixture
 def sample_profile():
-    return LinkedInProfile(
-        profile_id="profile_123",
-        name="John Doe",
-        title="Software Engineer",
-        company="Tech Corp",
-        profile_url="https://linkedin.com/in/johndoe"
-    )
+    return _PROFILE_TEMPLATE.model_copy(deep=True)
 
-@pytest.mark.asyncio
 async def test_search_profiles(linkedin_scraper):
     """Test searching for LinkedIn profiles."""
-    with patch("serpapi.GoogleSearch") as mock_search:
-        # Mock search results
-        mock_search.return_value.get_dict.return_value = {
-            "profiles": [
-                {
-                    "profile_id": "profile_1",
-                    "name": "John Doe",
-                    "title": "Software Engineer",
-                    "company": "Tech Corp",
-                    "profile_url": "https://linkedin.com/in/johndoe",
-                    "location": "San Francisco",
-                    "industry": "Technology"
-                }
-            ]
-        }
-        
-        # Search profiles
-        profiles = await linkedin_scraper.search_profiles(
-            keywords=["software engineer"],
-            location="San Francisco"
-        )
-        
-        assert len(profiles) == 1
-        assert profiles[0].name == "John Doe"
-        assert profiles[0].title == "Software Engineer"
-        
-@pytest.mark.asyncio
-async def test_enrich_profile(linkedin_scraper, sample_profile):
+    # Search profiles
+    profiles = await linkedin_scraper.search_profiles(
+        keywords=["software engineer"],
+        location="San Francisco"
+    )
+    
+    assert len(profiles) == 1
+    assert profiles[0].name == "John Doe"
+    assert profiles[0].title == "Software Engineer"
+    
+async def test_search_results_cached(linkedin_fixtures):
+    """Test that repeated searches for the same query hit the cache."""
+    client = FakeSerp(linkedin_fixtures)
+    linkedin_scraper = LinkedInScraper(search_client=client)
+    
+    first = await linkedin_scraper.search_profiles(["Software Engineer"], "San Francisco")
+    second = await linkedin_scraper.search_profiles(["software engineer"], "San Francisco")
+    third = await linkedin_scraper.search_profiles([" software engineer "], "san francisco ")
+    
+    assert client.calls == 1
+    assert client.params[0]["q"] == "software engineer"
+    assert client.params[0]["location"] == "san francisco"
+    assert [p.profile_id for p in first] == [p.profile_id for p in second] == [p.profile_id for p in third]
+    
+async def test_enrich_profile(linkedin_scraper, sample_profile, linkedin_fixtures):
     """Test enriching a profile with additional data."""
-    with patch("requests.post") as mock_post:
-        # Mock PhantomBuster response
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
-            "company_size": "1000+",
-            "about": "Experienced software engineer",
-            "experience": [
-                {
-                    "title": "Senior Engineer",
-                    "company": "Tech Corp",
-                    "duration": "2 years"
-                }
-            ],
-            "education": [
-                {
-                    "school": "Stanford",
-                    "degree": "BS Computer Science"
-                }
-            ],
-            "skills": ["Python", "JavaScript"],
-            "profile_image_url": "https://example.com/photo.jpg"
-        }
-        
-        # Enrich profile
-        enriched = await linkedin_scraper.enrich_profile(sample_profile)
-        
-        assert enriched.company_size == "1000+"
-        assert enriched.about == "Experienced software engineer"
-        assert len(enriched.experience) == 1
-        assert len(enriched.education) == 1
-        assert len(enriched.skills) == 2
-        
-@pytest.mark.asyncio
+    expected = linkedin_fixtures["enrich"]
+    
+    # Enrich profile
+    enriched = await linkedin_scraper.enrich_profile(sample_profile)
+    
+    assert enriched.company_size == expected["company_size"]
+    assert enriched.about == expected["about"]
+    assert len(enriched.experience) == len(expected["experience"])
+    assert len(enriched.education) == len(expected["education"])
+    assert len(enriched.skills) == len(expected["skills"])
+    
 async def test_get_company_info(linkedin_scraper):
     """Test getting company information."""
-    with patch("serpapi.GoogleSearch") as mock_search:
-        # Mock search results
-        mock_search.return_value.get_dict.return_value = {
-            "company": {
-                "name": "Tech Corp",
-                "website": "https://techcorp.com",
-                "size": "1000+",
-                "industry": "Technology",
-                "description": "Leading tech company",
-                "founded": "2010",
-                "headquarters": "San Francisco"
-            }
-        }
-        
-        # Get company info
-        info = await linkedin_scraper.get_company_info("Tech Corp")
-        
-        assert info["name"] == "Tech Corp"
-        assert info["website"] == "https://techcorp.com"
-        assert info["size"] == "1000+"
-        
-@pytest.mark.asyncio
+    # Get company info
+    info = await linkedin_scraper.get_company_info("Tech Corp")
+    
+    assert info["name"] == "Tech Corp"
+    assert info["website"] == "https://techcorp.com"
+    assert info["size"] == "1000+"
+    
 async def test_get_company_employees(linkedin_scraper):
     """Test getting company employees."""
-    with patch("serpapi.GoogleSearch") as mock_search:
-        # Mock search results
-        mock_search.return_value.get_dict.return_value = {
-            "employees": [
-                {
-                    "profile_id": "profile_1",
-                    "name": "John Doe",
-                    "title": "Software Engineer",
-                    "profile_url": "https://linkedin.com/in/johndoe"
-                }
-            ]
-        }
-        
-        # Get employees
-        employees = await linkedin_scraper.get_company_employees("Tech Corp")
-        
-        assert len(employees) == 1
-        assert employees[0].name == "John Doe"
-        assert employees[0].company == "Tech Corp"
-        
-@pytest.mark.asyncio
+    # Get employees
+    employees = await linkedin_scraper.get_company_employees("Tech Corp")
+    
+    assert len(employees) == 1
+    assert employees[0].name == "John Doe"
+    assert employees[0].company == "Tech Corp"
+    
 async def test_save_load_profile(linkedin_scraper, sample_profile):
     """Test saving and loading a profile."""
     # Save profile
@@ -144,18 +120,22 @@ async def test_save_load_profile(linkedin_scraper, sample_profile):
     assert loaded.title == sample_profile.title
     assert loaded.company == sample_profile.company
     
-@pytest.mark.asyncio
-async def test_error_handling(linkedin_scraper):
+async def test_error_handling(linkedin_fixtures):
     """Test error handling in profile operations."""
-    with patch("serpapi.GoogleSearch") as mock_search:
-        # Mock search error
-        mock_search.side_effect = Exception("API Error")
-        
-        # Search profiles
-        profiles = await linkedin_scraper.search_profiles(["software engineer"])
-        
-        assert len(profiles) == 0
-        
+    # Search client raising an API error
+    linkedin_scraper = LinkedInScraper(
+        search_client=FakeSerp(linkedin_fixtures, error=Exception("API Error"))
+    )
+    
+    # Search profiles
+    profiles = await linkedin_scraper.search_profiles(["software engineer"])
+    
+    assert len(profiles) == 0
+    
+    # Company lookups degrade to empty results as well
+    assert await linkedin_scraper.get_company_info("Tech Corp") == {}
+    assert await linkedin_scraper.get_company_employees("Tech Corp") == []
+    
     # Test loading non-existent profile
     profile = linkedin_scraper.load_profile("non_existent")
-    assert profile is None 
\ No newline at end of file
+    assert profile is None
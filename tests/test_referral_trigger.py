@@ -1,8 +1,6 @@
 import pytest
-from unittest.mock import MagicMock, patch
-from growth.referral_trigger import ReferralTrigger, REFERRAL_TRIGGERS_SENT, UGC_REWARD_TRIGGERED, INFLUENCER_THANK_YOU_SENT, REFERRAL_CONVERSION
+from growth.referral_trigger import ReferralTrigger
 from neonhub.schemas.referral_event import ReferralEvent
-from datetime import datetime
 
 def make_post(likes=100, platform="instagram", user="@user1"):
     return {
@@ -18,51 +16,49 @@ def make_profile(handle="@influencer", platform="instagram"):
         "platform": platform
     }
 
-def test_handle_ugc_engagement_discount():
-    trigger = ReferralTrigger()
-    with patch.object(trigger.messenger, 'send_whatsapp', return_value=MagicMock(status='sent')) as mock_wa:
-        post = make_post(likes=100)
-        event = trigger.handle_ugc_engagement(post)
-        assert isinstance(event, ReferralEvent)
-        assert event.reward_type == "discount"
-        assert event.channel == "whatsapp"
-        assert mock_wa.called
-        assert UGC_REWARD_TRIGGERED.labels(platform="instagram", reward_type="discount")._value.get() >= 1
-        assert REFERRAL_TRIGGERS_SENT.labels(type="ugc_reward", channel="whatsapp")._value.get() >= 1
+@pytest.fixture
+def trigger(stub_messenger):
+    t = ReferralTrigger()
+    t.messenger = stub_messenger
+    return t
 
-def test_handle_ugc_engagement_repost():
-    trigger = ReferralTrigger()
-    with patch.object(trigger.messenger, 'send_sms', return_value=MagicMock(status='sent')) as mock_sms:
-        post = make_post(likes=10, platform="tiktok")
-        event = trigger.handle_ugc_engagement(post)
-        assert isinstance(event, ReferralEvent)
-        assert event.reward_type == "repost"
-        assert event.channel == "email"
-        assert mock_sms.called
-        assert UGC_REWARD_TRIGGERED.labels(platform="tiktok", reward_type="repost")._value.get() >= 1
-        assert REFERRAL_TRIGGERS_SENT.labels(type="ugc_reward", channel="email")._value.get() >= 1
+# (handler call, (event_type, channel, reward_type, messenger channel), handler-specific metric sample)
+HANDLER_CASES = [
+    pytest.param(
+        lambda t: t.handle_ugc_engagement(make_post(likes=100)),
+        ("ugc_reward", "whatsapp", "discount", "wa"),
+        ("ugc_reward_triggered_total", (("platform", "instagram"), ("reward_type", "discount"))),
+        id="ugc_discount"
+    ),
+    pytest.param(
+        lambda t: t.handle_ugc_engagement(make_post(likes=10, platform="tiktok")),
+        ("ugc_reward", "email", "repost", "sms"),
+        ("ugc_reward_triggered_total", (("platform", "tiktok"), ("reward_type", "repost"))),
+        id="ugc_repost"
+    ),
+    pytest.param(
+        lambda t: t.handle_influencer_share(make_profile()),
+        ("influencer_share", "whatsapp", "thank_you", "wa"),
+        ("influencer_thank_you_sent_total", (("platform", "instagram"),)),
+        id="influencer_share"
+    ),
+    pytest.param(
+        lambda t: t.track_referral_conversion("ref123", "lead_456"),
+        ("referral_conversion", "email", "affiliate_bonus", "sms"),
+        ("referral_conversion_total", (("reward_type", "affiliate_bonus"),)),
+        id="referral_conversion"
+    ),
+]
 
-def test_handle_influencer_share():
-    trigger = ReferralTrigger()
-    with patch.object(trigger.messenger, 'send_whatsapp', return_value=MagicMock(status='sent')) as mock_wa:
-        profile = make_profile()
-        event = trigger.handle_influencer_share(profile)
-        assert isinstance(event, ReferralEvent)
-        assert event.event_type == "influencer_share"
-        assert event.reward_type == "thank_you"
-        assert event.channel == "whatsapp"
-        assert mock_wa.called
-        assert INFLUENCER_THANK_YOU_SENT.labels(platform="instagram")._value.get() >= 1
-        assert REFERRAL_TRIGGERS_SENT.labels(type="influencer_share", channel="whatsapp")._value.get() >= 1
-
-def test_track_referral_conversion():
-    trigger = ReferralTrigger()
-    with patch.object(trigger.messenger, 'send_sms', return_value=MagicMock(status='sent')) as mock_sms:
-        event = trigger.track_referral_conversion("ref123", "lead_456")
-        assert isinstance(event, ReferralEvent)
-        assert event.event_type == "referral_conversion"
-        assert event.reward_type == "affiliate_bonus"
-        assert event.channel == "email"
-        assert mock_sms.called
-        assert REFERRAL_CONVERSION.labels(reward_type="affiliate_bonus")._value.get() >= 1
-        assert REFERRAL_TRIGGERS_SENT.labels(type="referral_conversion", channel="email")._value.get() >= 1 
\ No newline at end of file
+@pytest.mark.parametrize("handle, expected, handler_metric", HANDLER_CASES)
+def test_referral_handlers(trigger, metric_snapshot, handle, expected, handler_metric):
+    event_type, channel, reward_type, sent_via = expected
+    event = handle(trigger)
+    assert isinstance(event, ReferralEvent)
+    assert event.event_type == event_type
+    assert event.channel == channel
+    assert event.reward_type == reward_type
+    assert trigger.messenger.sent(sent_via)
+    snap = metric_snapshot()
+    assert snap[handler_metric] >= 1
+    assert snap[("referral_triggers_sent_total", (("channel", channel), ("type", event_type)))] >= 1
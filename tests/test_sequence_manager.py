@@ -1,15 +1,26 @@
+import json
 import pytest
+import pytest_asyncio
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 
 from neonhub.services.sequence_manager import SequenceManager
 from neonhub.schemas.lead_state import LeadState, LeadStatus, SequenceStage
 
-@pytest.fixture
+class Clock:
+    """Manually advanced clock for SequenceManager."""
+    
+    def __init__(self, value: datetime):
+        self.value = value
+        
+    def __call__(self) -> datetime:
+        return self.value
+
+@pytest.fixture(scope="module")
 def sequence_manager():
     return SequenceManager()
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_sequence():
     return {
         "stages": [
@@ -34,16 +45,30 @@ def sample_sequence():
         ]
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_lead():
     return {
-        "id": "lead_123",
+        "id": "seq_lead_123",  # distinct from other modules: files run on separate xdist workers
         "email": "test@example.com",
         "first_name": "John",
         "company_name": "Test Corp"
     }
 
-@pytest.mark.asyncio
+@pytest_asyncio.fixture(scope="module")
+async def _lead_template(sequence_manager, sample_sequence, sample_lead):
+    return await sequence_manager.initialize_lead_sequence(
+        sample_lead["id"],
+        "campaign_1",
+        sample_sequence
+    )
+
+@pytest.fixture
+def initialized_lead(sequence_manager, _lead_template):
+    """Fresh copy of the initialized lead state, saved as the lead's current state."""
+    state = _lead_template.model_copy(deep=True)
+    sequence_manager.engagement_tracker.save_lead_state(state)
+    return state
+
 async def test_initialize_lead_sequence(sequence_manager, sample_sequence, sample_lead):
     """Test initializing a lead's sequence."""
     state = await sequence_manager.initialize_lead_sequence(
@@ -58,16 +83,8 @@ async def test_initialize_lead_sequence(sequence_manager, sample_sequence, sampl
     assert len(state.sequence_stages) == 3
     assert state.current_stage == 0
     
-@pytest.mark.asyncio
-async def test_get_next_action(sequence_manager, sample_sequence, sample_lead):
+async def test_get_next_action(sequence_manager, initialized_lead, sample_lead):
     """Test getting the next action for a lead."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Get first action
     action = await sequence_manager.get_next_action(
         sample_lead["id"],
@@ -80,16 +97,8 @@ async def test_get_next_action(sequence_manager, sample_sequence, sample_lead):
     assert "content" in action
     assert "metadata" in action
     
-@pytest.mark.asyncio
-async def test_complete_stage(sequence_manager, sample_sequence, sample_lead):
+async def test_complete_stage(sequence_manager, initialized_lead, sample_lead):
     """Test completing a sequence stage."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Complete first stage
     await sequence_manager.complete_stage(
         sample_lead["id"],
@@ -107,16 +116,8 @@ async def test_complete_stage(sequence_manager, sample_sequence, sample_lead):
     assert action["stage_id"] == "follow_up"
     assert action["template_id"] == "follow_up_email"
     
-@pytest.mark.asyncio
-async def test_stage_delay(sequence_manager, sample_sequence, sample_lead):
+async def test_stage_delay(sequence_manager, initialized_lead, sample_lead):
     """Test stage delay functionality."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Complete first stage
     await sequence_manager.complete_stage(
         sample_lead["id"],
@@ -132,16 +133,24 @@ async def test_stage_delay(sequence_manager, sample_sequence, sample_lead):
     
     assert action is None  # Should be None due to delay
     
-@pytest.mark.asyncio
-async def test_pause_resume_sequence(sequence_manager, sample_sequence, sample_lead):
-    """Test pausing and resuming a sequence."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
+async def test_stage_delay_elapses(sequence_manager, initialized_lead, sample_lead, monkeypatch):
+    """Test that a delayed stage becomes actionable once the clock passes its delay."""
+    clock = Clock(datetime(2024, 1, 1))
+    monkeypatch.setattr(sequence_manager, "_clock", clock)
+    
+    initialized_lead.sequence_stages[0].completed_at = clock.value
+    sequence_manager.engagement_tracker.save_lead_state(initialized_lead)
+    
+    assert await sequence_manager.get_next_action(sample_lead["id"], "campaign_1") is None
+    
+    clock.value += timedelta(hours=25)
+    action = await sequence_manager.get_next_action(sample_lead["id"], "campaign_1")
+    
+    assert action is not None
+    assert action["stage_id"] == "intro"
     
+async def test_pause_resume_sequence(sequence_manager, initialized_lead, sample_lead):
+    """Test pausing and resuming a sequence."""
     # Pause sequence
     await sequence_manager.pause_sequence(sample_lead["id"])
     
@@ -164,16 +173,8 @@ async def test_pause_resume_sequence(sequence_manager, sample_sequence, sample_l
     
     assert action is not None  # Should work after resume
     
-@pytest.mark.asyncio
-async def test_terminate_sequence(sequence_manager, sample_sequence, sample_lead):
+async def test_terminate_sequence(sequence_manager, initialized_lead, sample_lead):
     """Test terminating a sequence."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Terminate sequence
     await sequence_manager.terminate_sequence(
         sample_lead["id"],
@@ -188,16 +189,8 @@ async def test_terminate_sequence(sequence_manager, sample_sequence, sample_lead
     
     assert action is None  # Should be None due to terminated status
     
-@pytest.mark.asyncio
-async def test_max_attempts(sequence_manager, sample_sequence, sample_lead):
+async def test_max_attempts(sequence_manager, initialized_lead, sample_lead):
     """Test max attempts functionality."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Fail first stage multiple times
     for _ in range(3):
         await sequence_manager.complete_stage(
@@ -214,16 +207,8 @@ async def test_max_attempts(sequence_manager, sample_sequence, sample_lead):
     
     assert action is None  # Should be None due to max attempts reached
     
-@pytest.mark.asyncio
-async def test_sequence_completion(sequence_manager, sample_sequence, sample_lead):
+async def test_sequence_completion(sequence_manager, initialized_lead, sample_lead):
     """Test sequence completion."""
-    # Initialize sequence
-    await sequence_manager.initialize_lead_sequence(
-        sample_lead["id"],
-        "campaign_1",
-        sample_sequence
-    )
-    
     # Complete all stages
     for _ in range(3):
         await sequence_manager.complete_stage(
@@ -238,4 +223,22 @@ async def test_sequence_completion(sequence_manager, sample_sequence, sample_lea
         "campaign_1"
     )
     
-    assert action is None  # Should be None due to completed sequence 
\ No newline at end of file
+    assert action is None  # Should be None due to completed sequence
+
+
+def test_sequence_cache_invalidated_on_save(sequence_manager, sample_sequence):
+    """Test that cached sequences are served until the campaign is saved again."""
+    sequence_manager.save_sequence("campaign_cache", sample_sequence)
+    first = sequence_manager.get_sequence("campaign_cache")
+    with patch("json.load", wraps=json.load) as load:
+        assert sequence_manager.get_sequence("campaign_cache") == first
+    assert load.call_count == 0
+    
+    # Results are copies; mutating one leaves the cached sequence intact
+    first["stages"].clear()
+    assert sequence_manager.get_sequence("campaign_cache") == sample_sequence
+    
+    updated = {"stages": sample_sequence["stages"][:1]}
+    sequence_manager.save_sequence("campaign_cache", updated)
+    
+    assert len(sequence_manager.get_sequence("campaign_cache")["stages"]) == 1
@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 from ai.strategy_optimizer import StrategyOptimizer
-from optimization.content_feedback_loop import ContentFeedbackLoop
+from optimization.content_feedback_loop import ContentFeedbackLoop, PERFORMANCE_DTYPE
 from neonhub.config.settings import get_settings
 
 def test_strategy_optimizer_cycle(monkeypatch):
@@ -9,12 +10,8 @@ def test_strategy_optimizer_cycle(monkeypatch):
     settings = get_settings()
 
     # Simulate performance logs
-    feedback.performance_data = {
-        'welcome_email': [
-            {'template_id': 'welcome_email', 'variant_id': 'v1', 'channel': 'email', 'reply_rate': 0.25, 'open_rate': 0.5, 'click_rate': 0.1, 'timestamp': '2024-01-01T00:00:00Z'},
-            {'template_id': 'welcome_email', 'variant_id': 'v2', 'channel': 'email', 'reply_rate': 0.05, 'open_rate': 0.2, 'click_rate': 0.02, 'timestamp': '2024-01-01T00:00:00Z'}
-        ]
-    }
+    rates = np.array([(0.25, 0.5, 0.1), (0.05, 0.2, 0.02)], dtype=PERFORMANCE_DTYPE)
+    feedback.record_performance_batch('welcome_email', 'email', ['v1', 'v2'], rates)
     # Populate template_metadata
     feedback.analyze_performance('welcome_email')
     # Ensure the template_metadata dict exists
@@ -37,7 +34,7 @@ def test_strategy_optimizer_cycle(monkeypatch):
     monkeypatch.setattr(optimizer.influencer_scout, 'scan_social_for_influencers', lambda platform, kw, region=None: [MockProfile(12000, 0.09, 'neon')])
     monkeypatch.setattr(optimizer.influencer_scout, 'score_influencer', lambda p: {'score': 85, 'niche': p.niche, 'risk_flag': None})
     # Simulate referral event log
-    optimizer.referral_trigger.event_log = [{}]*25
+    optimizer.referral_trigger.event_count = 25
 
     # Run optimizer
     params = optimizer.analyze_and_optimize()
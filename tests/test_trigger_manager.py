@@ -1,50 +1,70 @@
+import json
+import threading
 import pytest
-from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
-from neonhub.services.trigger_manager import TriggerManager, TRIGGERS_FIRED, TRIGGERS_SUPPRESSED
+from datetime import datetime, timedelta, timezone
+from neonhub.services.trigger_manager import TriggerManager
 from neonhub.schemas.lead_state import LeadState, EngagementEvent, LeadStatus
 
 @pytest.fixture
-def trigger_manager():
+def trigger_manager(stub_messenger):
     tm = TriggerManager()
-    # Patch messenger to avoid real sends
-    tm.messenger.send_whatsapp = MagicMock(return_value=MagicMock(status='sent'))
-    tm.messenger.send_sms = MagicMock(return_value=MagicMock(status='sent'))
-    return tm
+    # Instance-level stub; the shared messenger itself is left untouched
+    tm.messenger = stub_messenger
+    yield tm
+    tm.close()
+
+# Validated once; tests get deep copies
+_LEAD_STATE_TEMPLATE = LeadState(
+    lead_id="lead_1",
+    campaign_id="camp_1",
+    current_stage=1,
+    status=LeadStatus.ACTIVE,
+    engagement_score=2,
+    last_touch=datetime.utcnow(),
+    sequence_stages=[],
+    engagement_history=[],
+    metadata={
+        "first_name": "Alex",
+        "persona": "Retail Buyer",
+        "lang": "en",
+        "phone": "+1234567890",
+        "whatsapp": "+1234567890",
+        "email": "alex@example.com"
+    }
+)
 
 @pytest.fixture
 def base_lead_state():
-    return LeadState(
-        lead_id="lead_1",
-        campaign_id="camp_1",
-        current_stage=1,
-        status=LeadStatus.ACTIVE,
-        engagement_score=2,
-        last_touch=datetime.utcnow(),
-        sequence_stages=[],
-        engagement_history=[],
-        metadata={
-            "first_name": "Alex",
-            "persona": "Retail Buyer",
-            "lang": "en",
-            "phone": "+1234567890",
-            "whatsapp": "+1234567890",
-            "email": "alex@example.com"
-        }
-    )
-
-def test_cart_abandonment_whatsapp(trigger_manager, base_lead_state):
+    return _LEAD_STATE_TEMPLATE.model_copy(deep=True)
+
+def test_cart_abandonment_whatsapp(trigger_manager, base_lead_state, metric_snapshot):
     # Simulate cart abandoned 2 hours ago
     base_lead_state.metadata["cart_abandoned_at"] = (datetime.utcnow() - timedelta(hours=2)).isoformat()
     base_lead_state.metadata["cart_product"] = "Neon Sign"
     base_lead_state.metadata["cart_offer_code"] = "SAVE20"
     base_lead_state.metadata["cart_url"] = "bit.ly/cart"
     result = trigger_manager.evaluate_and_trigger(base_lead_state)
-    assert trigger_manager.messenger.send_whatsapp.called
+    assert trigger_manager.messenger.sent("wa")
+    assert result is not None
+    snap = metric_snapshot()
+    assert snap[("triggers_fired_total", (("channel", "whatsapp"), ("type", "cart_recovery")))] >= 1
+
+def test_cart_abandonment_epoch_timestamp(trigger_manager, base_lead_state):
+    # Producer-side helper stores an epoch copy alongside the ISO timestamp
+    base_lead_state.mark_cart_abandoned(datetime.utcnow() - timedelta(hours=2))
+    assert "cart_abandoned_at_ts" in base_lead_state.metadata
+    result = trigger_manager.evaluate_and_trigger(base_lead_state)
+    assert trigger_manager.messenger.sent("wa")
     assert result is not None
-    assert TRIGGERS_FIRED.labels(type="cart_recovery", channel="whatsapp")._value.get() >= 1
 
-def test_low_engagement_sms(trigger_manager, base_lead_state):
+def test_cart_abandonment_aware_timestamp_converted(base_lead_state):
+    abandoned_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    base_lead_state.mark_cart_abandoned(abandoned_at)
+    # 12:00+02:00 is 10:00 UTC, not 12:00 UTC
+    expected = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+    assert base_lead_state.metadata["cart_abandoned_at_ts"] == str(int(expected.timestamp()))
+
+def test_low_engagement_sms(trigger_manager, base_lead_state, metric_snapshot):
     # Simulate 2 email sends, low score
     base_lead_state.engagement_score = 1
     base_lead_state.engagement_history = [
@@ -52,37 +72,86 @@ def test_low_engagement_sms(trigger_manager, base_lead_state):
         EngagementEvent(event_type="email_sent")
     ]
     result = trigger_manager.evaluate_and_trigger(base_lead_state)
-    assert trigger_manager.messenger.send_sms.called
+    assert trigger_manager.messenger.sent("sms")
     assert result is not None
-    assert TRIGGERS_FIRED.labels(type="cold_lead_nudge", channel="sms")._value.get() >= 1
+    snap = metric_snapshot()
+    assert snap[("triggers_fired_total", (("channel", "sms"), ("type", "cold_lead_nudge")))] >= 1
 
-def test_reply_suppresses_triggers(trigger_manager, base_lead_state):
+def test_reply_suppresses_triggers(trigger_manager, base_lead_state, metric_snapshot):
     # Simulate reply event
     base_lead_state.engagement_history = [
         EngagementEvent(event_type="email_reply")
     ]
     result = trigger_manager.evaluate_and_trigger(base_lead_state)
     assert result is None
-    assert TRIGGERS_SUPPRESSED.labels(reason="reply_received")._value.get() >= 1
+    snap = metric_snapshot()
+    assert snap[("triggers_suppressed_total", (("reason", "reply_received"),))] >= 1
 
-def test_unsubscribe_suppresses_triggers(trigger_manager, base_lead_state):
+def test_unsubscribe_suppresses_triggers(trigger_manager, base_lead_state, metric_snapshot):
     # Simulate unsubscribe event
     base_lead_state.engagement_history = [
         EngagementEvent(event_type="unsubscribe")
     ]
     result = trigger_manager.evaluate_and_trigger(base_lead_state)
     assert result is None
-    assert TRIGGERS_SUPPRESSED.labels(reason="unsubscribed")._value.get() >= 1
+    snap = metric_snapshot()
+    assert snap[("triggers_suppressed_total", (("reason", "unsubscribed"),))] >= 1
 
-def test_cooldown_enforcement(trigger_manager, base_lead_state):
+def test_cooldown_enforcement(trigger_manager, base_lead_state, metric_snapshot):
     # Simulate cart abandonment, first trigger fires
     base_lead_state.metadata["cart_abandoned_at"] = (datetime.utcnow() - timedelta(hours=2)).isoformat()
     base_lead_state.metadata["cart_product"] = "Neon Sign"
     base_lead_state.metadata["cart_offer_code"] = "SAVE20"
     base_lead_state.metadata["cart_url"] = "bit.ly/cart"
     result1 = trigger_manager.evaluate_and_trigger(base_lead_state)
-    assert trigger_manager.messenger.send_whatsapp.called
+    assert trigger_manager.messenger.sent("wa")
     # Second call within cooldown should suppress
     result2 = trigger_manager.evaluate_and_trigger(base_lead_state)
     assert result2 is None
-    assert TRIGGERS_SUPPRESSED.labels(reason="cooldown_or_missing_whatsapp")._value.get() >= 1 
\ No newline at end of file
+    snap = metric_snapshot()
+    assert snap[("triggers_suppressed_total", (("reason", "cooldown_or_missing_whatsapp"),))] >= 1
+
+
+def test_event_counts_follow_history(base_lead_state):
+    base_lead_state.add_engagement_event("email_sent", 0)
+    base_lead_state.add_engagement_event("email_sent", 0)
+    assert base_lead_state.event_counts() == {"email_sent": 2}
+    assert "email_sent" in base_lead_state.event_type_latest
+    # Replacing the history wholesale is picked up on the next read
+    base_lead_state.engagement_history = [EngagementEvent(event_type="email_reply")]
+    assert base_lead_state.event_counts() == {"email_reply": 1}
+
+def test_event_counts_same_length_replacement(trigger_manager, base_lead_state):
+    base_lead_state.add_engagement_event("email_sent", 0)
+    base_lead_state.add_engagement_event("email_sent", 0)
+    base_lead_state.engagement_history = [
+        EngagementEvent(event_type="email_reply"),
+        EngagementEvent(event_type="email_sent")
+    ]
+    assert base_lead_state.event_counts() == {"email_reply": 1, "email_sent": 1}
+    assert trigger_manager.evaluate_and_trigger(base_lead_state) is None
+
+def test_event_counts_rebuilt_on_load(base_lead_state):
+    base_lead_state.add_engagement_event("unsubscribe", 0)
+    payload = base_lead_state.model_dump()
+    payload["event_type_counts"] = {"email_sent": 1}  # stale, same total
+    loaded = LeadState.model_validate(payload)
+    assert loaded.event_counts() == {"unsubscribe": 1}
+
+def test_trigger_log_concurrent_writes(trigger_manager, tmp_path):
+    trigger_manager.trigger_log = str(tmp_path / "triggers.jsonl")
+
+    def write(n):
+        for i in range(50):
+            trigger_manager._log_trigger(f"lead_{n}", "cart", "sms", "sent", {"i": i})
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    trigger_manager.close()
+
+    lines = (tmp_path / "triggers.jsonl").read_bytes().splitlines()
+    assert len(lines) == 200
+    assert all(json.loads(line)["trigger_type"] == "cart" for line in lines)
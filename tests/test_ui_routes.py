@@ -1,8 +1,4 @@
 import pytest
-from fastapi.testclient import TestClient
-from dashboard_server import app
-
-client = TestClient(app)
 
 @pytest.mark.parametrize("route,expected_keys", [
     ("/metrics/content", ["top_templates"]),
@@ -15,8 +11,8 @@ client = TestClient(app)
     ("/metrics/linkedin", []),
     ("/metrics/full", ["memory_mb", "cpu_percent"]),
 ])
-def test_ui_routes(route, expected_keys):
-    resp = client.get(route)
+async def test_ui_routes(async_client, route, expected_keys):
+    resp = await async_client.get(route)
     assert resp.status_code == 200
     data = resp.json()
     for key in expected_keys: